@@ -1,6 +1,119 @@
+-- Generated by tools/generate_codec.py from tools/codec_spec.py.
+-- Do not edit by hand: change the spec and regenerate.
+
 -- Track SHIFT state for modifier functions
 g_shift_held = false
-g_is_playing = false
+
+-- Transport buttons indexed by CC number (DAW Port, channel 1).
+-- remote_init resolves item names to indices and kinds to handlers,
+-- so remote_process_midi does one table lookup per event.
+g_cc_dispatch = {
+    [0x0b] = { kind="momentary", item="Tap Tempo", shift_item="Click" },  -- CC 11 = Tap Tempo button
+    [0x0f] = { kind="page", step=-1 },  -- CC 15 = Bank - (SHIFT: previous knob page)
+    [0x10] = { kind="page", step=1 },  -- CC 16 = Bank + (SHIFT: next knob page)
+    [0x11] = { kind="shift" },  -- CC 17 = SHIFT button
+    [0x49] = { kind="press", item="Undo", shift_item="Redo" },  -- CC 73 = Undo button
+    [0x4c] = { kind="toggle", item="Play", off_item="Stop" },  -- CC 76 = Play/Stop toggle button
+    [0x4d] = { kind="press", item="Record", shift_item="Quantize" },  -- CC 77 = Record button
+}
+
+-- Toggle entries indexed by item, for remote_set_state
+g_toggle_by_item = {}
+
+-- Preset sync: remote_prepare_for_use requests the slot, remote_process_midi
+-- checksums the reply and remote_deliver_midi writes the preset only on a
+-- mismatch or when no reply arrives in time.
+g_preset_request = "F0 47 00 5D 66 00 01 02 F7"
+g_preset_slot = 2
+g_preset_length = 323
+g_preset_checksum = 156221
+g_preset_timeout_ms = 1000
+g_preset_state = "idle"  -- idle, requested, write, done
+g_preset_requested_at = 0
+
+-- Knob pages: page 0 is the scope's own Knob 1-8 mapping, pages 1..N
+-- use the "Page N Knob K" items. g_page_knobs[page][knob] holds item
+-- indices, so a page switch or a paged knob event is one table lookup.
+g_page = 0
+g_page_count = 61
+g_page_knobs = {}
+g_knob_by_cc = { [0x18]=1, [0x19]=2, [0x1a]=3, [0x1b]=4, [0x1c]=5, [0x1d]=6, [0x1e]=7, [0x1f]=8 }
+
+local function send_button(event, item_index, value)
+    remote.handle_input({ time_stamp=event.time_stamp, item=item_index, value=value })
+end
+
+-- True for a preset read reply (F0 47 00 5D 67 hi lo slot ...) for our slot
+local function is_preset_reply(event)
+    return event[1] == 0xF0 and event[2] == 0x47 and event[3] == 0x00
+        and event[4] == 0x5D and event[5] == 0x67 and event[8] == g_preset_slot
+end
+
+-- Same checksum as preset_checksum() in tools/generate_codec.py
+local function preset_checksum(event)
+    local checksum = 0
+    for i = 8, event.size - 1 do
+        checksum = (checksum * 31 + event[i]) % 1000003
+    end
+    return checksum
+end
+
+-- Handlers per dispatch kind; return true when the event is consumed
+g_cc_handlers = {
+    toggle = function(entry, value, event)
+        if value == 0 then
+            return false
+        end
+        entry.on = not entry.on
+        if entry.on then
+            send_button(event, entry.item_index, 1)
+        else
+            send_button(event, entry.off_index, 1)
+        end
+        return true
+    end,
+
+    shift = function(entry, value, event)
+        g_shift_held = (value > 0)
+        return true
+    end,
+
+    press = function(entry, value, event)
+        if value == 0 then
+            return false
+        end
+        if g_shift_held then
+            send_button(event, entry.shift_index, 1)
+        else
+            send_button(event, entry.item_index, 1)
+        end
+        return true
+    end,
+
+    momentary = function(entry, value, event)
+        if g_shift_held and value > 0 then
+            send_button(event, entry.shift_index, 1)
+        else
+            send_button(event, entry.item_index, value)
+        end
+        return true
+    end,
+
+    page = function(entry, value, event)
+        if not g_shift_held then
+            return false
+        end
+        if value > 0 then
+            -- A page exists for the focused device when its first knob is mapped
+            local page = g_page + entry.step
+            if page == 0 or (page >= 1 and page <= g_page_count
+                    and remote.is_item_enabled(g_page_knobs[page][1])) then
+                g_page = page
+            end
+        end
+        return true
+    end,
+}
 
 function remote_init()
     local items = {
@@ -40,6 +153,17 @@ function remote_init()
         -- Pads are handled as Keyboard notes (channel 10)
         -- They pass through as MIDI notes to Kong/Redrum
     }
+
+    -- Knob pages, appended after the fixed items: "Page N Knob K"
+    for page = 1, g_page_count do
+        local knobs = {}
+        for knob = 1, 8 do
+            table.insert(items, { name="Page " .. page .. " Knob " .. knob,
+                                  input="value", min=0, max=127 })
+            knobs[knob] = #items
+        end
+        g_page_knobs[page] = knobs
+    end
     remote.define_items(items)
 
     -- Build index lookup
@@ -48,34 +172,45 @@ function remote_init()
         g_items[item.name] = i
     end
 
+    -- Resolve dispatch entries once so per-event work stays constant
+    for cc, entry in pairs(g_cc_dispatch) do
+        entry.handler = g_cc_handlers[entry.kind]
+        entry.item_index = entry.item and g_items[entry.item]
+        entry.shift_index = entry.shift_item and g_items[entry.shift_item]
+        entry.off_index = entry.off_item and g_items[entry.off_item]
+        if entry.kind == "toggle" then
+            entry.on = false
+            g_toggle_by_item[entry.item_index] = entry
+        end
+    end
+
     local inputs = {
         -- Transport buttons come from DAW Port (port=1)
-        { pattern="b0 4a xx", name="Loop", port=1 },        -- CC 74
-        { pattern="b0 4e xx", name="Forward", port=1 },     -- CC 78
+        { pattern="b0 4a xx", name="Loop", port=1 },  -- CC 74
+        { pattern="b0 4e xx", name="Forward", port=1 },  -- CC 78
 
         -- Bank navigation buttons come from DAW Port (port=1)
-        { pattern="b0 0f xx", name="Bank -", port=1 },      -- CC 15
-        { pattern="b0 10 xx", name="Bank +", port=1 },      -- CC 16
+        { pattern="b0 0f xx", name="Bank -", port=1 },  -- CC 15
+        { pattern="b0 10 xx", name="Bank +", port=1 },  -- CC 16
 
         -- Joystick comes from MIDI Port (port=2)
         { pattern="e? xx yy", name="Pitch Bend", value="y*128 + x", port=2 },
         { pattern="b? 01 xx", name="Mod Wheel", port=2 },
 
         -- Knobs (Channel 1, CC 24-31) come from MIDI Port (port=2)
-        { pattern="b0 18 xx", name="Knob 1", port=2 },
-        { pattern="b0 19 xx", name="Knob 2", port=2 },
-        { pattern="b0 1a xx", name="Knob 3", port=2 },
-        { pattern="b0 1b xx", name="Knob 4", port=2 },
-        { pattern="b0 1c xx", name="Knob 5", port=2 },
-        { pattern="b0 1d xx", name="Knob 6", port=2 },
-        { pattern="b0 1e xx", name="Knob 7", port=2 },
-        { pattern="b0 1f xx", name="Knob 8", port=2 },
-
-        -- Keyboard handles ALL notes including channel 10 pads (from MIDI Port)
-        -- Pads will play as notes on the target instrument (Kong, Redrum, etc.)
-        {pattern="8? xx yy", name="Keyboard", value="0", note="x", velocity="64", port=2},
-        {pattern="9? xx 00", name="Keyboard", value="0", note="x", velocity="64", port=2},
-        {pattern="<100x>? yy zz", name="Keyboard", port=2},
+        { pattern="b0 18 xx", name="Knob 1", port=2 },  -- CC 24
+        { pattern="b0 19 xx", name="Knob 2", port=2 },  -- CC 25
+        { pattern="b0 1a xx", name="Knob 3", port=2 },  -- CC 26
+        { pattern="b0 1b xx", name="Knob 4", port=2 },  -- CC 27
+        { pattern="b0 1c xx", name="Knob 5", port=2 },  -- CC 28
+        { pattern="b0 1d xx", name="Knob 6", port=2 },  -- CC 29
+        { pattern="b0 1e xx", name="Knob 7", port=2 },  -- CC 30
+        { pattern="b0 1f xx", name="Knob 8", port=2 },  -- CC 31
+
+        -- Keyboard handles ALL notes including channel 10 pads (from MIDI Port) (port=2)
+        { pattern="8? xx yy", name="Keyboard", value="0", note="x", velocity="64", port=2 },
+        { pattern="9? xx 00", name="Keyboard", value="0", note="x", velocity="64", port=2 },
+        { pattern="<100x>? yy zz", name="Keyboard", port=2 },
     }
     remote.define_auto_inputs(inputs)
 end
@@ -90,75 +225,83 @@ function remote_probe()
 end
 
 function remote_prepare_for_use()
-    -- Send Kong-compatible preset to MPK Mini IV preset slot 2
+    -- Ask for preset slot 2; remote_deliver_midi writes the Kong-compatible
+    -- preset only if the reply differs from it or does not arrive
     -- This remaps pads to C1-D#2 (notes 36-51) for Kong/Redrum compatibility
     -- Pads 1-16 on controller map directly to Kong/Redrum pads 1-16
     -- NOTE: User must select preset 2 on controller (PROG SELECT + Pad 2)
     -- NOTE: Arpeggiator clock source cannot be set via SysEx (firmware limitation)
     --       User must manually set External clock: SHIFT + ARP → Clock → EXT
+    g_preset_state = "requested"
+    g_preset_requested_at = remote.get_time_ms()
     return {
-        remote.make_midi("F0 47 00 5D 67 02 3B 02 52 65 61 73 6F 6E 00 00 00 00 00 00 00 00 00 00 00 09 04 0C 00 78 03 01 00 00 01 00 7F 00 01 00 00 02 00 00 00 32 32 00 32 00 00 00 00 00 00 10 0A 01 01 01 01 01 01 01 01 01 01 01 01 01 01 01 01 00 04 00 00 00 01 00 00 00 24 00 10 01 0E 25 01 11 01 0E 26 02 12 01 0E 27 03 13 01 0E 28 04 14 01 0E 29 05 15 01 0E 2A 06 16 01 0E 2B 07 17 01 0E 2C 08 18 01 0E 2D 09 19 01 0E 2E 0A 1A 01 0E 2F 0B 1B 01 0E 30 0C 1C 01 0E 31 0D 1D 01 0E 32 0E 1E 01 0E 33 0F 1F 01 0E 18 00 7F 00 4B 6E 6F 62 31 00 00 00 00 00 00 00 00 00 00 00 19 00 7F 00 4B 6E 6F 62 32 00 00 00 00 00 00 00 00 00 00 00 1A 00 7F 00 4B 6E 6F 62 33 00 00 00 00 00 00 00 00 00 00 00 1B 00 7F 00 4B 6E 6F 62 34 00 00 00 00 00 00 00 00 00 00 00 1C 00 7F 00 4B 6E 6F 62 35 00 00 00 00 00 00 00 00 00 00 00 1D 00 7F 00 4B 6E 6F 62 36 00 00 00 00 00 00 00 00 00 00 00 1E 00 7F 00 4B 6E 6F 62 37 00 00 00 00 00 00 00 00 00 00 00 1F 00 7F 00 4B 6E 6F 62 38 00 00 00 00 00 00 00 00 00 00 00 F7"),
+        remote.make_midi(g_preset_request),
     }
 end
 
+function remote_deliver_midi(max_bytes, port)
+    if port ~= 1 then
+        return nil
+    end
+    if g_preset_state == "requested"
+            and remote.get_time_ms() - g_preset_requested_at >= g_preset_timeout_ms then
+        g_preset_state = "write"
+    end
+    if g_preset_state == "write" and max_bytes >= g_preset_length then
+        g_preset_state = "done"
+        return {
+            remote.make_midi("F0 47 00 5D 67 02 3B 02 52 65 61 73 6F 6E 00 00 00 00 00 00 00 00 00 00 00 09 00 0C 00 78 03 01 00 00 01 00 7F 00 01 00 00 02 00 00 00 32 32 00 32 00 00 00 00 00 00 10 0A 01 01 01 01 01 01 01 01 01 01 01 01 01 01 01 01 00 04 00 00 00 01 00 00 00 24 00 10 01 0E 25 01 11 01 0E 26 02 12 01 0E 27 03 13 01 0E 28 04 14 01 0E 29 05 15 01 0E 2A 06 16 01 0E 2B 07 17 01 0E 2C 08 18 01 0E 2D 09 19 01 0E 2E 0A 1A 01 0E 2F 0B 1B 01 0E 30 0C 1C 01 0E 31 0D 1D 01 0E 32 0E 1E 01 0E 33 0F 1F 01 0E 18 00 7F 00 4B 6E 6F 62 31 00 00 00 00 00 00 00 00 00 00 00 19 00 7F 00 4B 6E 6F 62 32 00 00 00 00 00 00 00 00 00 00 00 1A 00 7F 00 4B 6E 6F 62 33 00 00 00 00 00 00 00 00 00 00 00 1B 00 7F 00 4B 6E 6F 62 34 00 00 00 00 00 00 00 00 00 00 00 1C 00 7F 00 4B 6E 6F 62 35 00 00 00 00 00 00 00 00 00 00 00 1D 00 7F 00 4B 6E 6F 62 36 00 00 00 00 00 00 00 00 00 00 00 1E 00 7F 00 4B 6E 6F 62 37 00 00 00 00 00 00 00 00 00 00 00 1F 00 7F 00 4B 6E 6F 62 38 00 00 00 00 00 00 00 00 00 00 00 F7"),
+        }
+    end
+    return nil
+end
+
 function remote_process_midi(event)
     -- Channel 10 notes (pads) pass through to auto_inputs -> Keyboard
     -- Don't intercept them here - let keyboard patterns handle them
 
+    -- Preset read reply (Software Port, port=3)
+    if event.port == 3 then
+        if g_preset_state == "requested" and is_preset_reply(event) then
+            if event.size == g_preset_length and preset_checksum(event) == g_preset_checksum then
+                g_preset_state = "done"
+            else
+                g_preset_state = "write"
+            end
+        end
+        return true
+    end
+
     -- Transport CC handling - only process events from DAW Port (port=1)
     -- Note: event.port is 1-indexed in Reason Remote
     if event.port == 1 then
         local ret = remote.match_midi("b0 xx yy", event)
         if ret then
-            local cc = ret.x
-            local value = ret.y
-
-            -- CC 76 = Play/Stop toggle button
-            if cc == 0x4c and value > 0 then
-                g_is_playing = not g_is_playing
-                if g_is_playing then
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Play"], value=1 })
-                else
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Stop"], value=1 })
-                end
-                return true
-            end
-
-            -- CC 17 = SHIFT button
-            if cc == 0x11 then
-                g_shift_held = (value > 0)
-                return true
-            end
-
-            -- CC 77 = Record button (or Quantize when SHIFT held)
-            if cc == 0x4d and value > 0 then
-                if g_shift_held then
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Quantize"], value=1 })
-                else
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Record"], value=1 })
-                end
-                return true
+            local entry = g_cc_dispatch[ret.x]
+            if entry then
+                return entry.handler(entry, ret.y, event)
             end
+        end
+    end
 
-            -- CC 73 = Undo button (or Redo when SHIFT held)
-            if cc == 0x49 and value > 0 then
-                if g_shift_held then
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Redo"], value=1 })
-                else
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Undo"], value=1 })
-                end
+    -- Knobs on a selected page (MIDI Port, port=2); page 0 falls through
+    -- to the Knob 1-8 auto inputs
+    if g_page > 0 and event.port == 2 then
+        local ret = remote.match_midi("b0 xx yy", event)
+        local knob = ret and g_knob_by_cc[ret.x]
+        if knob then
+            local knobs = g_page_knobs[g_page]
+            if remote.is_item_enabled(knobs[knob]) then
+                send_button(event, knobs[knob], ret.y)
                 return true
             end
-
-            -- CC 11 = Tap Tempo button (or Click when SHIFT held)
-            if cc == 0x0b then
-                if g_shift_held and value > 0 then
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Click"], value=1 })
-                else
-                    remote.handle_input({ time_stamp=event.time_stamp, item=g_items["Tap Tempo"], value=value })
-                end
-                return true
+            if not remote.is_item_enabled(knobs[1]) then
+                -- Focus moved to a device without this page
+                g_page = 0
+                return false
             end
+            -- Unused knob on a partly filled page
+            return true
         end
     end
 
@@ -166,14 +309,13 @@ function remote_process_midi(event)
 end
 
 function remote_set_state(changed_items)
-    -- Track transport state from Reason
-    if g_items and g_items["Play"] then
-        for i, item_index in ipairs(changed_items) do
-            if item_index == g_items["Play"] then
-                local state = remote.get_item_state(item_index)
-                if state and state.value then
-                    g_is_playing = (state.value > 0)
-                end
+    -- Track toggle state (Play/Stop) from Reason
+    for i, item_index in ipairs(changed_items) do
+        local entry = g_toggle_by_item[item_index]
+        if entry then
+            local state = remote.get_item_state(item_index)
+            if state and state.value then
+                entry.on = (state.value > 0)
             end
         end
     end
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Generate one MPK Mini IV preset per device scope in MPK_mini_IV.remotemap.
+Each knob's name field gets its mapped remotable, abbreviated to fit, and
+drum devices get Kong pad notes. Scopes are built in a process pool and a
+content-hash cache skips scopes whose inputs have not changed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_reason_preset import (KONG_PAD_NOTES, KNOB_NAME_LENGTH, PAD_NOTE_OFFSETS,
+                                    build_reason_preset, encode_sysex, load_presets,
+                                    set_knob_name, validate_sysex)
+from remote_files import REMOTEMAP_PATH, REPO_DIR, load_remotemap
+
+OUTPUT_DIR = os.path.join(REPO_DIR, 'build', 'presets')
+CACHE_NAME = 'cache.json'
+
+# Bump when the build logic changes so cached presets are rebuilt
+GENERATOR_VERSION = 3
+
+# Devices whose pads should play notes 36-51 (Kong/Redrum pad 1-16 layout)
+DRUM_MODELS = {
+    'Kong Drum Designer',
+    'Redrum Drum Computer',
+    'Dr.REX Loop Player',
+    'se.propellerheads.RDK',
+    'se.propellerheads.Umpf',
+    'se.propellerheads.UmpfRetroBeats',
+}
+
+# Display names for models whose id does not read well
+DEVICE_NAMES = {
+    'se.propellerheads.externalmidiinstrument': 'External MIDI',
+}
+
+# Scopes that are not devices with knob parameters
+SKIP_MODELS = {'Master Keyboard', 'Reason Document'}
+
+# Applied one word at a time, right to left, until a name fits
+WORD_ABBREVIATIONS = {
+    'Advanced': 'Adv', 'Amount': 'Amt', 'Arpeggiator': 'Arp', 'Attack': 'Atk',
+    'Channel': 'Ch', 'Compressor': 'Comp', 'Decay': 'Dec', 'Delay': 'Dly',
+    'Designer': 'Dsgn', 'Digital': 'Dig', 'Distortion': 'Dist', 'Envelope': 'Env',
+    'Equalizer': 'EQ', 'Essentials': 'Ess', 'Expression': 'Expr', 'Feedback': 'Fdbk',
+    'Filter': 'Flt', 'Frequency': 'Freq', 'Level': 'Lvl', 'Master': 'Mst',
+    'Modulation': 'Mod', 'Monophonic': 'Mono', 'Movement': 'Move', 'Octave': 'Oct',
+    'Oscillator': 'Osc', 'Parametric': 'Param', 'Position': 'Pos', 'Release': 'Rel',
+    'Resonance': 'Res', 'Reverb': 'Rvb', 'Section': 'Sect', 'Signal': 'Sig',
+    'Sustain': 'Sus', 'Synced': 'Sync', 'Synthesizer': 'Synth', 'Threshold': 'Thresh',
+    'Velocity': 'Vel', 'Volume': 'Vol', 'Waveform': 'Wave',
+}
+
+
+# Stripped from the end of an abbreviated name
+TRAILING_PUNCTUATION = ' /-_.,:;&+'
+
+
+def abbreviate(name, length=KNOB_NAME_LENGTH, whole_words=True):
+    """Shorten a remotable or device name to at most `length` ASCII characters.
+
+    Tries word abbreviations first, then drops inner vowels from the longest
+    words (not acronyms or model numbers such as "THOR", "RV-7"), then drops
+    trailing words. With whole_words=False, or when a single word is too
+    long on its own, the name is cut mid-word instead.
+    """
+    name = name.encode('ascii', errors='replace').decode('ascii').replace('_', ' ')
+    words = name.split()
+    for i in reversed(range(len(words))):
+        if len(' '.join(words)) <= length:
+            break
+        words[i] = WORD_ABBREVIATIONS.get(words[i], words[i])
+
+    fixed = set()
+    while len(' '.join(words)) > length:
+        candidates = [i for i in range(len(words))
+                      if i not in fixed and not words[i].isupper()
+                      and not re.search(r'\d', words[i])]
+        if not candidates:
+            break
+        longest = max(candidates, key=lambda i: len(words[i]))
+        word = words[longest]
+        shorter = word[0] + re.sub(r'[aeiouAEIOU]', '', word[1:])
+        if shorter == word or len(word) <= 3:
+            fixed.add(longest)
+        else:
+            words[longest] = shorter
+
+    # Cut at a space, "/" or "-" rather than inside a word
+    text = ' '.join(words)
+    if len(text) > length:
+        cut = None
+        if whole_words:
+            cut = max((i for i in range(1, length + 1) if text[i] in ' /-'), default=None)
+        text = text[:cut] if cut else text[:length]
+    return text.rstrip(TRAILING_PUNCTUATION)
+
+
+def knob_labels(remotables, length=KNOB_NAME_LENGTH):
+    """Abbreviate a preset's knob names, cutting mid-word only where whole
+    words would give two knobs the same name ("Obj 1 Dmpng Hi F" / "... Hi S")."""
+    labels = [abbreviate(r, length) if r else None for r in remotables]
+    clashes = {label for label in labels if label and labels.count(label) > 1}
+    return [abbreviate(r, length, whole_words=False) if label in clashes else label
+            for r, label in zip(remotables, labels)]
+
+
+def device_name(model):
+    """Return a display name for a scope model.
+
+    Reverse-DNS and VST ids keep only their last part:
+    "se.propellerheads.Pulsar" -> "Pulsar", "vst3.5653...Serum 2" -> "Serum 2".
+    """
+    if model in DEVICE_NAMES:
+        return DEVICE_NAMES[model]
+    if re.match(r'^[a-z0-9]+\.[A-Za-z0-9]', model):
+        model = model.rsplit('.', 1)[-1]
+    return model
+
+
+def knob_names(scope):
+    """Return the remotable mapped to Knob 1-8, using the first group variation."""
+    names = [None] * 8
+    for entry in scope['maps']:
+        match = re.fullmatch(r'Knob ([1-8])', entry['control'])
+        if match and names[int(match.group(1)) - 1] is None:
+            names[int(match.group(1)) - 1] = entry['remotable']
+    return names
+
+
+def device_scopes(remotemap):
+    """Return the scopes that map at least one knob."""
+    return [scope for scope in remotemap['scopes']
+            if scope['model'] not in SKIP_MODELS and any(knob_names(scope))]
+
+
+def scope_job(scope, base_preset, slot, name_length):
+    """Return the JSON-serializable inputs for one scope's preset."""
+    return {
+        'model': scope['model'],
+        'name': device_name(scope['model']),
+        'knobs': knob_names(scope),
+        'drum': scope['model'] in DRUM_MODELS,
+        'slot': slot,
+        'name_length': name_length,
+        'base': list(base_preset),
+        'version': GENERATOR_VERSION,
+    }
+
+
+def job_hash(job):
+    return hashlib.sha256(json.dumps(job, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def file_name(job):
+    """Return a file system safe .syx name for a job's device."""
+    return re.sub(r'[^A-Za-z0-9.+-]+', '_', job['name']).strip('_') + '.syx'
+
+
+def build_device_preset(job):
+    """Build and validate one device preset; returns the full SysEx message."""
+    base = job['base']
+    pad_notes = KONG_PAD_NOTES if job['drum'] else [base[offset] for offset in PAD_NOTE_OFFSETS]
+    preset = build_reason_preset(base, name=abbreviate(job['name'], 16), pad_notes=pad_notes,
+                                 slot=job['slot'])
+    for knob, label in enumerate(knob_labels(job['knobs'], job['name_length'])):
+        if label:
+            set_knob_name(preset, knob, label)
+
+    sysex = encode_sysex(preset)
+    validate_sysex(sysex)
+    return sysex
+
+
+def _build_to_file(args):
+    job, path = args
+    sysex = build_device_preset(job)
+    with open(path, 'wb') as f:
+        f.write(bytes(sysex))
+    return path
+
+
+def build_library(remotemap_path=REMOTEMAP_PATH, output_dir=OUTPUT_DIR, slot=2,
+                  name_length=KNOB_NAME_LENGTH, jobs=None, force=False):
+    """Write one .syx per device scope; returns (built, skipped) file names."""
+    base_preset = load_presets()['1']
+    scopes = device_scopes(load_remotemap(remotemap_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    cache_path = os.path.join(output_dir, CACHE_NAME)
+    cache = {}
+    if os.path.exists(cache_path) and not force:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+
+    pending, skipped, hashes = [], [], {}
+    for scope in scopes:
+        job = scope_job(scope, base_preset, slot, name_length)
+        name = file_name(job)
+        if name in hashes:
+            raise ValueError(f"Two scopes would write {name}")
+        hashes[name] = job_hash(job)
+        path = os.path.join(output_dir, name)
+        if cache.get(name) == hashes[name] and os.path.exists(path):
+            skipped.append(name)
+        else:
+            pending.append((job, path))
+
+    if jobs == 1 or len(pending) < 2:
+        built = [_build_to_file(item) for item in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            built = list(pool.map(_build_to_file, pending, chunksize=8))
+
+    with open(cache_path, 'w') as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+    return [os.path.basename(p) for p in built], skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate per-device MPK Mini IV presets')
+    parser.add_argument('--remotemap', default=REMOTEMAP_PATH, help='Remotemap to read scopes from')
+    parser.add_argument('--output', '-o', default=OUTPUT_DIR, help='Directory for .syx files')
+    parser.add_argument('--slot', '-s', type=int, default=2, help='Preset slot the files write to')
+    parser.add_argument('--name-length', type=int, default=KNOB_NAME_LENGTH,
+                        help='Maximum knob name length')
+    parser.add_argument('--jobs', '-j', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', '-f', action='store_true', help='Ignore the cache')
+    parser.add_argument('--list', '-l', action='store_true',
+                        help='Print each device and its knob names instead of writing files')
+    args = parser.parse_args(argv)
+
+    if not 2 <= args.slot <= 8:
+        parser.error("slot must be 2-8 (slot 1 is the read-only DAW preset)")
+    if not 1 <= args.name_length <= KNOB_NAME_LENGTH:
+        parser.error(f"name length must be 1-{KNOB_NAME_LENGTH}")
+
+    if args.list:
+        for scope in device_scopes(load_remotemap(args.remotemap)):
+            names = [n or '-' for n in knob_labels(knob_names(scope), args.name_length)]
+            drum = ' (drum pads)' if scope['model'] in DRUM_MODELS else ''
+            print(f"{abbreviate(device_name(scope['model']), 16)}{drum}: {', '.join(names)}")
+        return
+
+    built, skipped = build_library(args.remotemap, args.output, args.slot,
+                                   args.name_length, args.jobs, args.force)
+    print(f"Built {len(built)} presets, {len(skipped)} unchanged, in {args.output}")
+    if not built and not skipped:
+        print("No device scopes with knob mappings found", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+"""
+MPK Mini IV tools benchmark suite.
+Times the hot paths in tools/ against synthetic event streams, so it runs
+without hardware. Run from the repo root with:
+
+    python tools/bench --save-baseline
+    python tools/bench --threshold 0.15
+"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Run the benchmark suite, save results as JSON and compare with a baseline.
+Exits with status 1 when any case is slower than the baseline by more
+than the regression threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.dirname(BENCH_DIR)
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from bench.cases import CASES  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def time_case(run, repeat, warmup=1):
+    """Return wall times in seconds for `repeat` calls of run()."""
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        run()
+        times.append((time.perf_counter_ns() - start) / 1e9)
+    return times
+
+
+def run_suite(names, repeat, scale):
+    results = {}
+    for name in names:
+        try:
+            run, events = CASES[name](scale)
+        except ImportError as e:
+            print(f"  {name:<42s} skipped ({e})", file=sys.stderr)
+            continue
+        times = time_case(run, repeat)
+        best = min(times)
+        results[name] = {
+            'events': events,
+            'best_s': best,
+            'median_s': statistics.median(times),
+            'mean_s': statistics.fmean(times),
+            'ns_per_event': best * 1e9 / events if events else None,
+        }
+        per_event = results[name]['ns_per_event']
+        per_event = f"{per_event:9.1f}" if per_event is not None else f"{'-':>9s}"
+        print(f"  {name:<42s} {best * 1e3:9.3f} ms  {per_event} ns/event", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return (name, ratio) for every case slower than baseline by more than threshold."""
+    regressions = []
+    print(f"\nCompared with baseline ({baseline.get('created', '?')}):", file=sys.stderr)
+    for name, current in results.items():
+        previous = baseline.get('cases', {}).get(name)
+        if not previous:
+            print(f"  {name:<42s} (new)", file=sys.stderr)
+            continue
+        ratio = current['best_s'] / previous['best_s']
+        flag = 'REGRESSION' if ratio > 1 + threshold else ''
+        print(f"  {name:<42s} {ratio:6.2f}x  {flag}", file=sys.stderr)
+        if flag:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MPK Mini IV tools benchmarks')
+    parser.add_argument('--filter', '-k', help='Only run cases whose name contains this')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--scale', '-s', type=float, default=1.0, help='Stream size multiplier')
+    parser.add_argument('--output', '-o', help='Write results JSON to this path')
+    parser.add_argument('--baseline', '-b', default=DEFAULT_BASELINE,
+                        help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the new baseline')
+    parser.add_argument('--threshold', '-t', type=float, default=0.10,
+                        help='Allowed slowdown before a case counts as a regression (0.10 = 10%%)')
+    parser.add_argument('--list', '-l', action='store_true', help='List cases and exit')
+    args = parser.parse_args()
+
+    names = [n for n in CASES if not args.filter or args.filter in n]
+    if args.list:
+        print('\n'.join(names))
+        return
+
+    print(f"Running {len(names)} cases (repeat={args.repeat}, scale={args.scale})", file=sys.stderr)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'scale': args.scale,
+        'cases': run_suite(names, args.repeat, args.scale),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+        return
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('scale') != args.scale:
+        print(f"\nWARNING: baseline was run with scale={baseline.get('scale')}", file=sys.stderr)
+
+    regressions = compare(report['cases'], baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
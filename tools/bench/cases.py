@@ -0,0 +1,192 @@
+"""
+Benchmark cases for the hot paths in tools/.
+Each setup function builds its inputs once and returns (run, events):
+`run` is the timed callable and `events` the number of items it processes.
+"""
+
+import contextlib
+import io
+
+CASES = {}
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _format_all(messages):
+    from midi_listener import MIDIListener
+
+    listener = MIDIListener(output_format='json')
+
+    def run():
+        for msg in messages:
+            listener.format_message(msg)
+    return run, len(messages)
+
+
+@case('listener.format_message.knob_sweep')
+def format_knob_sweep(scale):
+    from bench import streams
+    return _format_all(streams.knob_sweep(seconds=10 * scale))
+
+
+@case('listener.format_message.pad_roll')
+def format_pad_roll(scale):
+    from bench import streams
+    return _format_all(streams.pad_roll(rolls=int(100 * scale)))
+
+
+@case('listener.format_message.clock')
+def format_clock(scale):
+    from bench import streams
+    return _format_all(streams.clock(bars=int(64 * scale)))
+
+
+def _process_all(messages, tracer):
+    from midi_listener import MIDIListener
+
+    listener = MIDIListener(output_format='json', tracer=tracer)
+
+    def run():
+        listener.captured_messages = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for msg in messages:
+                listener.process_message(msg, 0.0, 'bench')
+    return run, len(messages)
+
+
+@case('listener.process_message')
+def process_untraced(scale):
+    from bench import streams
+    return _process_all(streams.mixed_session(scale), None)
+
+
+@case('listener.process_message.traced')
+def process_traced(scale):
+    from bench import streams
+    from tracing import Tracer
+    return _process_all(streams.mixed_session(scale), Tracer())
+
+
+@case('listener.print_summary')
+def summary(scale):
+    from bench import streams
+    from midi_listener import MIDIListener
+
+    listener = MIDIListener(output_format='json')
+    listener.captured_messages = [listener.format_message(m)
+                                  for m in streams.mixed_session(scale)]
+
+    def run():
+        with contextlib.redirect_stderr(io.StringIO()):
+            listener.print_summary()
+    return run, len(listener.captured_messages)
+
+
+@case('preset.decode')
+def preset_decode(scale):
+    from bench import streams
+    from decode_preset import decode_preset
+
+    bank = streams.preset_bank(size=int(1000 * scale))
+
+    def run():
+        for preset in bank:
+            decode_preset(preset)
+    return run, len(bank)
+
+
+@case('preset.encode')
+def preset_encode(scale):
+    from bench import streams
+    from generate_reason_preset import encode_sysex
+
+    bank = streams.preset_bank(size=int(1000 * scale))
+
+    def run():
+        for preset in bank:
+            encode_sysex(preset)
+    return run, len(bank)
+
+
+@case('preset.build_reason')
+def preset_build_reason(scale):
+    from bench import streams
+    from generate_reason_preset import build_reason_preset, encode_sysex, to_hex
+
+    bank = streams.preset_bank(size=int(1000 * scale))
+
+    def run():
+        for preset in bank:
+            to_hex(encode_sysex(build_reason_preset(preset)))
+    return run, len(bank)
+
+
+@case('store.changed')
+def store_changed(scale):
+    import atexit
+    import shutil
+    import tempfile
+
+    from bench import streams
+    from preset_store import PresetStore
+
+    directory = tempfile.mkdtemp(prefix='mpk-bench-store-')
+    atexit.register(shutil.rmtree, directory, True)
+    store = PresetStore(directory)
+    bank = streams.preset_bank(size=int(2000 * scale))
+    for i, preset in enumerate(bank):
+        store.add(preset, time=f"{i:08d}")
+    store.matrix()
+
+    def run():
+        store.changed('knobs.3.cc')
+    return run, len(bank)
+
+
+@case('clock.deadline')
+def clock_deadline(scale):
+    from midi_clock import ClockSchedule
+
+    schedule = ClockSchedule(bpm=123.0, swing=58.0)
+    ticks = range(int(100_000 * scale))
+
+    def run():
+        for tick in ticks:
+            schedule.deadline(tick)
+    return run, len(ticks)
+
+
+@case('remotemap.parse')
+def remotemap_parse(scale):
+    from remote_files import REMOTEMAP_PATH, parse_remotemap
+
+    with open(REMOTEMAP_PATH, 'r', encoding='utf-8') as f:
+        text = f.read()
+    copies = max(1, int(10 * scale))
+
+    def run():
+        for _ in range(copies):
+            parse_remotemap(text)
+    return run, copies * text.count('\n')
+
+
+@case('remote_info.parse')
+def remote_info_parse(scale):
+    from remote_files import parse_remote_info, remote_info_paths
+
+    texts = []
+    for path in remote_info_paths():
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    copies = max(1, int(10 * scale))
+
+    def run():
+        for _ in range(copies):
+            for text in texts:
+                parse_remote_info(text)
+    return run, copies * sum(text.count('\n') for text in texts)
@@ -0,0 +1,80 @@
+"""
+Synthetic MIDI event streams shaped like real MPK Mini IV sessions.
+Each generator returns mido messages with `time` set to seconds since
+the start of the stream.
+"""
+
+import random
+
+import mido
+
+from generate_reason_preset import PAD_NOTE_OFFSETS, load_presets
+
+KNOB_CCS = list(range(24, 32))
+PAD_NOTES = list(range(36, 52))
+PAD_CHANNEL = 9  # Channel 10
+
+
+def knob_sweep(seconds=10.0, rate_hz=1000, knobs=8):
+    """Knobs turned end to end and back, one CC every 1/rate_hz seconds."""
+    messages = []
+    for i in range(int(seconds * rate_hz)):
+        phase = i % 254
+        value = phase if phase < 128 else 254 - phase
+        messages.append(mido.Message('control_change', channel=0,
+                                     control=KNOB_CCS[i % knobs], value=value,
+                                     time=i / rate_hz))
+    return messages
+
+
+def pad_roll(rolls=100, pads=16, interval=0.005, seed=1):
+    """All 16 pads struck in turn per roll, note on followed by note off."""
+    rng = random.Random(seed)
+    messages = []
+    t = 0.0
+    for _ in range(rolls):
+        for note in PAD_NOTES[:pads]:
+            messages.append(mido.Message('note_on', channel=PAD_CHANNEL, note=note,
+                                         velocity=rng.randint(1, 127), time=t))
+            messages.append(mido.Message('note_off', channel=PAD_CHANNEL, note=note,
+                                         velocity=0, time=t + interval / 2))
+            t += interval
+    return messages
+
+
+def clock(bars=64, bpm=120.0, ppqn=24):
+    """Start, 24 ppqn timing clock for `bars` bars of 4/4, then Stop."""
+    tick = 60.0 / (bpm * ppqn)
+    ticks = bars * 4 * ppqn
+    messages = [mido.Message('start', time=0.0)]
+    messages.extend(mido.Message('clock', time=i * tick) for i in range(ticks))
+    messages.append(mido.Message('stop', time=ticks * tick))
+    return messages
+
+
+def mixed_session(scale=1.0):
+    """Knobs, pads, pitch bend and clock interleaved by timestamp."""
+    messages = knob_sweep(seconds=2 * scale) + pad_roll(rolls=int(20 * scale))
+    messages += clock(bars=max(1, int(8 * scale)))
+    messages += [mido.Message('pitchwheel', channel=0, pitch=p, time=i / 500)
+                 for i, p in enumerate(range(-8192, 8192, 64))]
+    messages.sort(key=lambda m: m.time)
+    return messages
+
+
+def preset_bank(size=1000, seed=1):
+    """Raw presets derived from presets_raw.json with varied pad notes, knob CCs and names."""
+    rng = random.Random(seed)
+    bases = list(load_presets().values())
+    bank = []
+    for i in range(size):
+        preset = list(bases[i % len(bases)])
+        preset[6] = (i % 8) + 1
+        name = f"Bank{i:05d}".encode('ascii')
+        preset[7:7 + len(name)] = name
+        for offset in PAD_NOTE_OFFSETS:
+            preset[offset] = rng.randint(0, 127)
+        for knob in range(8):
+            preset[161 + knob * 20] = rng.randint(0, 127)
+        bank.append(preset)
+    return bank
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Group a large device's remotables into knob pages of 8.
+Reads the Remote Info exports in device_data/, orders each device's usable
+remotables by section prefix ("A", "Env", "Filter", ...) and writes:
+
+  - tools/knob_pages.json, the page index the codec generator embeds
+  - "Page N Knob K" Map lines in the device's remotemap scope
+
+Page 0 is the scope's own Knob 1-8 mapping; SHIFT + Bank -/+ steps through
+pages 1..N in the codec.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from remote_files import (DEVICE_DATA_DIR, REMOTEMAP_PATH, SCRIPT_DIR, load_remote_info,
+                          parse_remotemap, remote_info_paths)
+
+PAGE_INDEX_PATH = os.path.join(SCRIPT_DIR, 'knob_pages.json')
+PAGE_SIZE = 8
+
+# Devices with more usable remotables than this get pages
+MIN_REMOTABLES = 64
+
+# Sections smaller than this are collected on the trailing "Misc" pages
+MIN_SECTION_SIZE = 5
+
+# Sections listed here come first, in this order; the rest follow in file order
+SECTION_ORDER = ['A', 'B', 'C', 'Noise', 'Sub', 'Osc', 'Filter', 'Env', 'LFO', 'Mod', 'Arp']
+
+# Remotables that are MIDI proxies or unnamed plugin slots, not synth parameters
+EXCLUDE_PATTERNS = [
+    r'^Proxy ',
+    r'^CC\d+ ',
+    r'\bParam ?\d+$',
+    r'\bChan \d+$',
+]
+
+PAGE_CONTROL = re.compile(r'^Page (\d+) Knob [1-8]$')
+
+
+def page_control(page, knob):
+    """Return the codec item name for knob 1-8 on page 1-N."""
+    return f"Page {page} Knob {knob}"
+
+
+def section_name(remotable):
+    """Return the section prefix of a remotable: "A Level" -> "A", "LFO 1 Rate" -> "LFO"."""
+    return re.split(r'[ >_]', remotable, maxsplit=1)[0]
+
+
+def usable_remotables(info, skip=()):
+    """Return the remotables that accept values and are worth a knob, in file order."""
+    return [r['name'] for r in info['remotables']
+            if r['input_type'] == 'Value' and r['name'] not in skip
+            and not any(re.search(p, r['name']) for p in EXCLUDE_PATTERNS)]
+
+
+def build_pages(remotables, page_size=PAGE_SIZE):
+    """Group remotables into pages, each section starting on a new page.
+
+    Sections follow SECTION_ORDER, then the order of their first remotable;
+    sections smaller than MIN_SECTION_SIZE share the last pages. Returns
+    (sections, pages) where sections is [[name, first_page, page_count], ...]
+    with 1-based page numbers and pages is a list of page_size lists padded
+    with None.
+    """
+    by_section = {}
+    for name in remotables:
+        by_section.setdefault(section_name(name), []).append(name)
+
+    rank = {section: i for i, section in enumerate(SECTION_ORDER)}
+    misc = []
+    ordered = []
+    for section, names in sorted(by_section.items(), key=lambda s: rank.get(s[0], len(rank))):
+        if len(names) < MIN_SECTION_SIZE:
+            misc.extend(names)
+        else:
+            ordered.append((section, names))
+    if misc:
+        ordered.append(("Misc", misc))
+
+    sections, pages = [], []
+    for section, names in ordered:
+        first = len(pages) + 1
+        for i in range(0, len(names), page_size):
+            page = names[i:i + page_size]
+            pages.append(page + [None] * (page_size - len(page)))
+        sections.append([section, first, len(pages) - first + 1])
+    return sections, pages
+
+
+def base_knob_remotables(scope):
+    """Return the remotables the scope already maps on Knob 1-8 (page 0)."""
+    return {m['remotable'] for m in scope['maps'] if re.fullmatch(r'Knob [1-8]', m['control'])}
+
+
+def build_index(remotemap, remote_infos, min_remotables=MIN_REMOTABLES):
+    """Return the page index for every mapped device with enough remotables."""
+    scopes = {scope['model']: scope for scope in remotemap['scopes']}
+    devices = {}
+    for path, info in remote_infos:
+        scope = scopes.get(info['model'])
+        if scope is None:
+            continue
+        remotables = usable_remotables(info, skip=base_knob_remotables(scope))
+        if len(remotables) <= min_remotables:
+            continue
+        sections, pages = build_pages(remotables)
+        devices[info['model']] = {
+            'info': os.path.basename(path),
+            'sections': sections,
+            'pages': pages,
+        }
+    return {'page_size': PAGE_SIZE, 'devices': devices}
+
+
+def page_count(index):
+    """Return the number of pages the codec must define items for."""
+    return max((len(d['pages']) for d in index['devices'].values()), default=0)
+
+
+def load_page_index(path=PAGE_INDEX_PATH):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def render_index(index):
+    """Format the index as JSON with one page per line."""
+    lines = ['{', f'  "page_size": {index["page_size"]},', '  "devices": {']
+    models = sorted(index['devices'])
+    for d, model in enumerate(models):
+        device = index['devices'][model]
+        lines.append(f'    {json.dumps(model)}: {{')
+        lines.append(f'      "info": {json.dumps(device["info"])},')
+        lines.append(f'      "sections": {json.dumps(device["sections"])},')
+        lines.append('      "pages": [')
+        for p, page in enumerate(device['pages']):
+            comma = ',' if p < len(device['pages']) - 1 else ''
+            lines.append(f'        {json.dumps(page)}{comma}')
+        lines.append('      ]')
+        lines.append('    }' + (',' if d < len(models) - 1 else ''))
+    lines.extend(['  }', '}'])
+    return '\n'.join(lines) + '\n'
+
+
+def render_remotemap(text, index):
+    """Return the remotemap text with each paged scope's Page Map lines regenerated."""
+    remotemap = parse_remotemap(text)
+    lines = text.split('\n')
+    drop = set()
+    insert_after = {}
+    for scope in remotemap['scopes']:
+        for entry in scope['maps']:
+            if PAGE_CONTROL.match(entry['control']):
+                drop.add(entry['line'] - 1)
+        device = index['devices'].get(scope['model'])
+        if device is None:
+            continue
+        last = max([scope['line']] + [m['line'] for m in scope['maps']
+                                      if not PAGE_CONTROL.match(m['control'])])
+        new = []
+        for page, remotables in enumerate(device['pages'], 1):
+            for knob, remotable in enumerate(remotables, 1):
+                if remotable:
+                    new.append(f"Map\t{page_control(page, knob)}\t\t{remotable}")
+        insert_after[last - 1] = new
+
+    out = []
+    for i, line in enumerate(lines):
+        if i not in drop:
+            out.append(line)
+        out.extend(insert_after.get(i, []))
+    return '\n'.join(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build knob pages for large devices')
+    parser.add_argument('--remotemap', default=REMOTEMAP_PATH, help='Remotemap to update')
+    parser.add_argument('--output', '-o', default=PAGE_INDEX_PATH, help='Page index path to write')
+    parser.add_argument('--min-remotables', type=int, default=MIN_REMOTABLES,
+                        help='Only page devices with more usable remotables than this')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit non-zero if the index or remotemap is out of date')
+    parser.add_argument('--list', '-l', action='store_true', help='Print each page instead of writing')
+    args = parser.parse_args(argv)
+
+    with open(args.remotemap, 'r', encoding='utf-8') as f:
+        remotemap_text = f.read()
+    infos = [(path, load_remote_info(path)) for path in remote_info_paths(DEVICE_DATA_DIR)]
+    index = build_index(parse_remotemap(remotemap_text), infos, args.min_remotables)
+
+    if args.list:
+        for model, device in sorted(index['devices'].items()):
+            print(f"{model}: {len(device['pages'])} pages")
+            for section, first, count in device['sections']:
+                for page in range(first, first + count):
+                    names = [n or '-' for n in device['pages'][page - 1]]
+                    print(f"  {page:3d} {section:<8s} {', '.join(names)}")
+        return
+
+    outputs = [(args.output, render_index(index)),
+               (args.remotemap, render_remotemap(remotemap_text, index))]
+    if args.check:
+        stale = []
+        for path, text in outputs:
+            current = None
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    current = f.read()
+            if current != text:
+                stale.append(path)
+        for path in stale:
+            print(f"{os.path.normpath(path)} is out of date; run tools/build_pages.py", file=sys.stderr)
+        if stale:
+            sys.exit(1)
+        print("Knob pages are up to date")
+        return
+
+    for path, text in outputs:
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+    pages = page_count(index)
+    print(f"Wrote {len(index['devices'])} paged device(s), up to {pages} pages, to {args.output}")
+    print(f"Updated {args.remotemap}; regenerate the codec with tools/generate_codec.py")
+
+
+if __name__ == '__main__':
+    main()
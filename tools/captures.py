@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Columnar MIDI capture storage and analytics.
+Turns listener captures (records from MIDIListener or `listen --format json`
+output) into NumPy columns - timestamp, port, status, data1, data2 - saved
+as .npz or as a directory of memory-mapped .npy files, and runs common
+analyses over them vectorized, a chunk at a time, so captures larger than
+memory can be queried.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# column: dtype
+COLUMNS = {
+    'timestamp': 'float64',
+    'port': 'uint8',
+    'status': 'uint8',
+    'data1': 'uint8',
+    'data2': 'uint8',
+}
+
+CHUNK_SIZE = 1 << 24  # events per chunk, about 200 MB of temporaries
+
+PAD_CHANNEL = 10
+PAD_NOTES = range(36, 52)
+KNOB_CHANNEL = 1
+KNOB_CCS = range(24, 32)
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        sys.exit("ERROR: numpy is required for capture export (pip install numpy)")
+    return np
+
+
+def record_bytes(record):
+    """Return (status, data1, data2) from a formatted record's hex field."""
+    raw = record['hex'].split()
+    status = int(raw[0], 16)
+    data1 = int(raw[1], 16) if len(raw) > 1 else 0
+    data2 = int(raw[2], 16) if len(raw) > 2 else 0
+    return status, data1, data2
+
+
+def columns_from_records(records, port_names=None):
+    """Build columns from an iterable of formatted records.
+
+    Returns (columns, port_names); port names are stored once and the
+    port column holds indices into that list.
+    """
+    np = _numpy()
+    records = list(records)
+    port_names = list(port_names or [])
+    port_index = {name: i for i, name in enumerate(port_names)}
+    n = len(records)
+    columns = {name: np.empty(n, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    for i, record in enumerate(records):
+        port = record.get('port', '')
+        if port not in port_index:
+            port_index[port] = len(port_names)
+            port_names.append(port)
+        columns['timestamp'][i] = record.get('time', i)
+        columns['port'][i] = port_index[port]
+        columns['status'][i], columns['data1'][i], columns['data2'][i] = record_bytes(record)
+
+    return columns, port_names
+
+
+def export_jsonl(src, dst, batch_size=100_000):
+    """Stream a `listen --format json` capture into columns at dst.
+
+    The file is read twice: once to count events so the .npy files can be
+    allocated at full size, once to fill them a chunk at a time.
+    """
+    np = _numpy()
+    with open(src, 'r') as f:
+        n = sum(1 for line in f if line.strip())
+
+    columns = _create(dst, n) if not dst.endswith('.npz') else \
+        {name: np.empty(n, dtype=dtype) for name, dtype in COLUMNS.items()}
+    port_names = []
+    pos = 0
+    with open(src, 'r') as f:
+        batch = []
+        for line in f:
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                pos = _fill(columns, pos, batch, port_names)
+                batch = []
+        pos = _fill(columns, pos, batch, port_names)
+
+    if dst.endswith('.npz'):
+        save_npz(columns, port_names, dst)
+    else:
+        for array in columns.values():
+            array.flush()
+        _write_ports(dst, port_names)
+    return n
+
+
+def _fill(columns, pos, batch, port_names):
+    if not batch:
+        return pos
+    part, names = columns_from_records(batch, port_names)
+    port_names[:] = names
+    for name in COLUMNS:
+        columns[name][pos:pos + len(batch)] = part[name]
+    return pos + len(batch)
+
+
+def _create(directory, n):
+    np = _numpy()
+    os.makedirs(directory, exist_ok=True)
+    return {name: np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'),
+                                            mode='w+', dtype=dtype, shape=(n,))
+            for name, dtype in COLUMNS.items()}
+
+
+def _write_ports(directory, port_names):
+    with open(os.path.join(directory, 'ports.json'), 'w') as f:
+        json.dump(port_names, f)
+
+
+def save_npz(columns, port_names, path):
+    np = _numpy()
+    np.savez(path, port_names=np.array(port_names, dtype=str), **columns)
+
+
+def save_npy(columns, port_names, directory):
+    """Save one .npy per column so the capture can be memory-mapped."""
+    np = _numpy()
+    os.makedirs(directory, exist_ok=True)
+    for name in COLUMNS:
+        np.save(os.path.join(directory, f'{name}.npy'), columns[name])
+    _write_ports(directory, port_names)
+
+
+def save(columns, port_names, path):
+    """Save as .npz when path ends in .npz, otherwise as a .npy directory."""
+    if path.endswith('.npz'):
+        save_npz(columns, port_names, path)
+    else:
+        save_npy(columns, port_names, path)
+
+
+def load(path, mmap=True):
+    """Load columns and port names; .npy directories are memory-mapped."""
+    np = _numpy()
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in COLUMNS}
+            return columns, data['port_names'].tolist()
+    columns = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+               for name in COLUMNS}
+    with open(os.path.join(path, 'ports.json'), 'r') as f:
+        return columns, json.load(f)
+
+
+def iter_chunks(columns, chunk=CHUNK_SIZE):
+    """Yield column dicts of at most `chunk` events (views, no copies)."""
+    n = len(columns['status'])
+    for start in range(0, n, chunk):
+        yield {name: array[start:start + chunk] for name, array in columns.items()}
+
+
+def _note_on(c):
+    return ((c['status'] & 0xF0) == 0x90) & (c['data2'] > 0)
+
+
+def pad_velocity_distribution(columns, channel=PAD_CHANNEL, notes=PAD_NOTES, chunk=CHUNK_SIZE):
+    """Return {note: counts[128]} of note-on velocities for each pad note."""
+    np = _numpy()
+    notes = np.asarray(list(notes))
+    lookup = np.full(128, -1, dtype=np.int64)
+    lookup[notes] = np.arange(len(notes))
+    counts = np.zeros(len(notes) * 128, dtype=np.int64)
+
+    for c in iter_chunks(columns, chunk):
+        mask = _note_on(c) & ((c['status'] & 0x0F) == channel - 1)
+        pad = lookup[c['data1'][mask]]
+        hit = pad >= 0
+        counts += np.bincount(pad[hit] * 128 + c['data2'][mask][hit], minlength=counts.size)
+
+    counts = counts.reshape(len(notes), 128)
+    return {int(note): counts[i] for i, note in enumerate(notes)}
+
+
+def knob_movement_rate(columns, channel=KNOB_CHANNEL, ccs=KNOB_CCS, chunk=CHUNK_SIZE):
+    """Return {cc: {'events_per_s', 'travel_per_s'}} for each knob.
+
+    travel_per_s is the summed absolute value change per second of capture.
+    """
+    np = _numpy()
+    ccs = list(ccs)
+    lookup = np.full(128, -1, dtype=np.int64)
+    lookup[ccs] = np.arange(len(ccs))
+    events = np.zeros(len(ccs), dtype=np.int64)
+    travel = np.zeros(len(ccs), dtype=np.int64)
+    last = np.full(len(ccs), -1, dtype=np.int64)  # carried across chunks
+
+    for c in iter_chunks(columns, chunk):
+        mask = c['status'] == 0xB0 + channel - 1
+        knob = lookup[c['data1'][mask]]
+        hit = knob >= 0
+        knob = knob[hit]
+        values = c['data2'][mask][hit].astype(np.int64)
+        if not len(knob):
+            continue
+        events += np.bincount(knob, minlength=len(ccs))
+
+        # Group each knob's values in capture order, then diff within groups
+        order = np.argsort(knob, kind='stable')
+        knob, values = knob[order], values[order]
+        first = np.ones(len(knob), dtype=bool)
+        first[1:] = knob[1:] != knob[:-1]
+        previous = np.empty_like(values)
+        previous[1:] = values[:-1]
+        previous[first] = last[knob[first]]
+        step = np.abs(values - previous)
+        step[previous < 0] = 0
+        travel += np.bincount(knob, weights=step, minlength=len(ccs)).astype(np.int64)
+        last_index = np.append(np.nonzero(first)[0][1:], len(knob)) - 1
+        last[knob[last_index]] = values[last_index]
+
+    duration = _duration(columns)
+    return {cc: {'events_per_s': events[i] / duration, 'travel_per_s': travel[i] / duration}
+            for i, cc in enumerate(ccs)}
+
+
+def _duration(columns):
+    timestamps = columns['timestamp']
+    if not len(timestamps):
+        return 1.0
+    return max(float(timestamps[-1] - timestamps[0]), 1e-9)
+
+
+def _bin_count(columns, bin_seconds):
+    return int(_duration(columns) // bin_seconds) + 1
+
+
+def note_density(columns, bin_seconds=1.0, chunk=CHUNK_SIZE):
+    """Return note-ons per bin of `bin_seconds`, from the first event on."""
+    np = _numpy()
+    if not len(columns['timestamp']):
+        return np.zeros(0, dtype=np.int64)
+    t0 = float(columns['timestamp'][0])
+    bins = _bin_count(columns, bin_seconds)
+    density = np.zeros(bins, dtype=np.int64)
+
+    for c in iter_chunks(columns, chunk):
+        index = ((c['timestamp'][_note_on(c)] - t0) // bin_seconds).astype(np.int64)
+        density += np.bincount(index, minlength=bins)[:bins]
+    return density
+
+
+def joystick_note_correlation(columns, bin_seconds=0.25, chunk=CHUNK_SIZE):
+    """Correlate mean joystick position with note-on count per time bin.
+
+    Returns {'pitch_bend': r, 'mod_wheel': r}; r is nan when an axis never
+    moved or no notes were played. Only bins where the axis moved count.
+    """
+    np = _numpy()
+    if not len(columns['timestamp']):
+        return {'pitch_bend': float('nan'), 'mod_wheel': float('nan')}
+    t0 = float(columns['timestamp'][0])
+    bins = _bin_count(columns, bin_seconds)
+    notes = np.zeros(bins)
+    sums = {'pitch_bend': np.zeros(bins), 'mod_wheel': np.zeros(bins)}
+    counts = {'pitch_bend': np.zeros(bins), 'mod_wheel': np.zeros(bins)}
+
+    for c in iter_chunks(columns, chunk):
+        index = ((c['timestamp'] - t0) // bin_seconds).astype(np.int64)
+        notes += np.bincount(index[_note_on(c)], minlength=bins)[:bins]
+
+        kind = c['status'] & 0xF0
+        bend = kind == 0xE0
+        value = c['data2'][bend].astype(np.int64) * 128 + c['data1'][bend]
+        sums['pitch_bend'] += np.bincount(index[bend], weights=value, minlength=bins)[:bins]
+        counts['pitch_bend'] += np.bincount(index[bend], minlength=bins)[:bins]
+
+        mod = (kind == 0xB0) & (c['data1'] == 1)
+        sums['mod_wheel'] += np.bincount(index[mod], weights=c['data2'][mod], minlength=bins)[:bins]
+        counts['mod_wheel'] += np.bincount(index[mod], minlength=bins)[:bins]
+
+    result = {}
+    for axis in sums:
+        moved = counts[axis] > 0
+        if moved.sum() < 2:
+            result[axis] = float('nan')
+            continue
+        position = sums[axis][moved] / counts[axis][moved]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[axis] = float(np.corrcoef(position, notes[moved])[0, 1])
+    return result
+
+
+def export_main(argv=None):
+    parser = argparse.ArgumentParser(description='Export a JSON capture to NumPy columns')
+    parser.add_argument('capture', help='Output of `listen --format json`')
+    parser.add_argument('output', help='.npz file, or a directory for memory-mapped .npy files')
+    args = parser.parse_args(argv)
+
+    n = export_jsonl(args.capture, args.output)
+    print(f"Exported {n} events to {args.output}")
+
+
+def analyze_main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze an exported capture')
+    parser.add_argument('capture', help='.npz file or .npy directory')
+    parser.add_argument('--bin', type=float, default=1.0, help='Note density bin in seconds')
+    args = parser.parse_args(argv)
+
+    columns, port_names = load(args.capture)
+    print(f"{len(columns['status'])} events over {_duration(columns):.1f} s on {port_names}")
+
+    print("\nPad velocities (channel 10):")
+    for note, counts in pad_velocity_distribution(columns).items():
+        hits = int(counts.sum())
+        if hits:
+            mean = (counts * range(128)).sum() / hits
+            print(f"  Note {note:3d}: {hits:8d} hits, mean velocity {mean:5.1f}")
+
+    print("\nKnob movement (channel 1):")
+    for cc, rate in knob_movement_rate(columns).items():
+        print(f"  CC {cc:3d}: {rate['events_per_s']:8.2f} events/s, {rate['travel_per_s']:8.2f} steps/s")
+
+    density = note_density(columns, args.bin)
+    if len(density):
+        print(f"\nNote density: mean {density.mean():.2f}, peak {density.max()} per {args.bin:g} s")
+
+    print("\nJoystick vs note density correlation:")
+    for axis, r in joystick_note_correlation(columns).items():
+        print(f"  {axis}: {r:+.3f}")
+
+
+if __name__ == '__main__':
+    analyze_main()
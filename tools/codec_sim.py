@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Run the generated Lua codec against a stubbed Reason Remote API.
+Each scenario loads a fresh copy of reason_remote/MPK mini IV.lua, feeds it
+MIDI events and checks what it hands to Reason and sends to the controller.
+Needs lupa (pip install lupa); no Reason or hardware.
+"""
+
+import argparse
+import sys
+
+from generate_codec import CODEC_PATH
+from generate_reason_preset import reason_preset_hex
+
+# Minimal remote.* API: records items, inputs and handled events, and keeps
+# a settable clock and set of enabled (mapped) items
+REMOTE_STUB = """
+remote = {}
+sim = { defined = {}, handled = {}, enabled = {}, now = 0 }
+
+function remote.define_items(items) sim.defined = items end
+function remote.define_auto_inputs(inputs) sim.inputs = inputs end
+function remote.handle_input(msg) table.insert(sim.handled, msg) end
+function remote.make_midi(hex) return hex end
+function remote.get_time_ms() return sim.now end
+function remote.is_item_enabled(index) return sim.enabled[index] == true end
+function remote.get_item_state(index) return { value = 0 } end
+
+-- Hex bytes and xx/yy/zz captures, the subset of patterns the codec uses
+function remote.match_midi(pattern, event)
+    local ret, i = {}, 0
+    for token in string.gmatch(pattern, "%S+") do
+        i = i + 1
+        local byte = event[i]
+        if byte == nil then
+            return nil
+        end
+        if token == "xx" or token == "yy" or token == "zz" then
+            ret[string.sub(token, 1, 1)] = byte
+        elseif tonumber(token, 16) ~= byte then
+            return nil
+        end
+    end
+    if i ~= event.size then
+        return nil
+    end
+    return ret
+end
+"""
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def hex_bytes(text):
+    return [int(b, 16) for b in text.split()]
+
+
+class CodecSim:
+    """One codec instance in a Lua runtime with the stubbed remote API."""
+
+    def __init__(self, path=CODEC_PATH):
+        try:
+            import lupa
+        except ImportError:
+            sys.exit("ERROR: lupa is required to run the codec (pip install lupa)")
+        self.lua = lupa.LuaRuntime()
+        self.lua.execute(REMOTE_STUB)
+        with open(path, 'r', encoding='utf-8') as f:
+            self.lua.execute(f.read())
+        self.sim = self.lua.globals().sim
+        self.lua.globals().remote_init()
+        self.item_index = {item.name: i for i, item in self.sim.defined.items()}
+
+    def call(self, name, *args):
+        func = self.lua.globals()[name]
+        expect(func is not None, f"codec does not define {name}()")
+        return func(*args)
+
+    def event(self, port, data):
+        """Pass one MIDI message to remote_process_midi; returns True if consumed."""
+        table = self.lua.table_from(list(data))
+        table.port = port
+        table.size = len(data)
+        table.time_stamp = self.sim.now
+        return bool(self.call('remote_process_midi', table))
+
+    def cc(self, port, cc, value):
+        return self.event(port, [0xB0, cc, value])
+
+    def handled(self):
+        """Return and clear [(item name, value)] passed to remote.handle_input."""
+        names = {i: n for n, i in self.item_index.items()}
+        out = [(names[msg.item], msg.value) for msg in self.sim.handled.values()]
+        self.sim.handled = self.lua.table()
+        return out
+
+    def enable(self, names):
+        for name in names:
+            self.sim.enabled[self.item_index[name]] = True
+
+    def advance(self, ms):
+        self.sim.now = self.sim.now + ms
+
+    def deliver(self, max_bytes=1024, port=1):
+        """Return the hex strings remote_deliver_midi sends."""
+        events = self.call('remote_deliver_midi', max_bytes, port)
+        return list(events.values()) if events else []
+
+    def prepare(self):
+        return list(self.call('remote_prepare_for_use').values())
+
+
+def expect(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def preset_reply(change=None):
+    """Return the controller's reply for an up-to-date preset, optionally with one byte changed."""
+    reply = hex_bytes(reason_preset_hex())
+    if change is not None:
+        reply[change] = (reply[change] + 1) % 0x80
+    return reply
+
+
+@scenario('preset.request')
+def preset_request(codec):
+    sent = codec.prepare()
+    expect(sent == ["F0 47 00 5D 66 00 01 02 F7"],
+           f"prepare sent {[m[:26] + '...' for m in sent]}")
+    expect(codec.deliver() == [], "wrote the preset before any reply")
+
+
+@scenario('preset.match')
+def preset_match(codec):
+    codec.prepare()
+    expect(codec.event(3, preset_reply()), "reply not consumed")
+    codec.advance(5000)
+    expect(codec.deliver() == [], "wrote a preset the controller already has")
+
+
+@scenario('preset.mismatch')
+def preset_mismatch(codec):
+    codec.prepare()
+    codec.event(3, preset_reply(change=90))
+    sent = codec.deliver()
+    expect(sent == [reason_preset_hex()], f"expected one preset write, got {len(sent)} messages")
+    expect(codec.deliver() == [], "wrote the preset twice")
+
+
+@scenario('preset.timeout')
+def preset_timeout(codec):
+    codec.prepare()
+    codec.advance(500)
+    expect(codec.deliver() == [], "wrote before the timeout")
+    codec.advance(600)
+    expect(codec.deliver(max_bytes=64) == [], "wrote more than max_bytes")
+    expect(codec.deliver() == [reason_preset_hex()], "no write after the timeout")
+    expect(codec.event(3, preset_reply()), "late reply not consumed")
+    expect(codec.deliver() == [], "late reply caused a second write")
+
+
+@scenario('preset.other_slot')
+def preset_other_slot(codec):
+    codec.prepare()
+    reply = preset_reply()
+    reply[7] = 3
+    codec.event(3, reply)
+    codec.event(3, preset_reply())
+    expect(codec.deliver() == [], "a reply for another slot was taken as slot 2")
+
+
+@scenario('transport.shift')
+def transport_shift(codec):
+    codec.cc(1, 77, 127)
+    codec.cc(1, 17, 127)
+    codec.cc(1, 77, 127)
+    codec.cc(1, 73, 127)
+    codec.cc(1, 17, 0)
+    codec.cc(1, 73, 127)
+    got = codec.handled()
+    expected = [("Record", 1), ("Quantize", 1), ("Redo", 1), ("Undo", 1)]
+    expect(got == expected, f"handled {got}")
+    expect(not codec.cc(1, 74, 127), "Loop should fall through to its auto input")
+
+
+@scenario('pages.switch')
+def pages_switch(codec):
+    codec.enable(f"Page {p} Knob {k}" for p in (1, 2) for k in range(1, 9))
+    expect(not codec.cc(1, 16, 127), "Bank + without SHIFT should fall through")
+    expect(not codec.cc(2, 24, 10), "page 0 knobs should fall through")
+    codec.cc(1, 17, 127)
+    for _ in range(4):
+        codec.cc(1, 16, 127)
+        codec.cc(1, 16, 0)
+    codec.cc(1, 17, 0)
+    expect(codec.cc(2, 25, 64), "paged knob not consumed")
+    expect(codec.handled() == [("Page 2 Knob 2", 64)], "page did not stop at the last mapped page")
+    codec.sim.enabled = codec.lua.table()
+    expect(not codec.cc(2, 24, 1), "knob on an unmapped page should fall through")
+    codec.enable(["Page 2 Knob 1"])
+    expect(not codec.cc(2, 24, 1), "page did not reset after the focus change")
+
+
+def run(names=None, path=CODEC_PATH):
+    """Run scenarios on fresh codec instances; returns {name: error or None}."""
+    results = {}
+    for name, func in SCENARIOS.items():
+        if names and not any(n in name for n in names):
+            continue
+        try:
+            func(CodecSim(path))
+            results[name] = None
+        except AssertionError as e:
+            results[name] = str(e)
+        except Exception as e:  # Lua runtime errors surface as lupa.LuaError
+            results[name] = f"{type(e).__name__}: {e}"
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the Lua codec against a stubbed Remote API')
+    parser.add_argument('--codec', default=CODEC_PATH, help='Codec to load')
+    parser.add_argument('--filter', '-k', action='append', help='Only run scenarios containing this text')
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.codec)
+    for name, error in results.items():
+        print(f"{'FAIL' if error else 'ok':4s}  {name}" + (f": {error}" if error else ""))
+    failed = sum(1 for error in results.values() if error)
+    print(f"{len(results) - failed} passed, {failed} failed", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
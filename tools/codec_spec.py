@@ -0,0 +1,105 @@
+"""
+MPK Mini IV codec spec.
+Single source for the items, ports, CCs and SHIFT alternates that
+generate_codec.py turns into reason_remote/MPK mini IV.lua.
+"""
+
+# Input ports, in the order declared in MPK mini IV.luacodec (1-indexed in Lua)
+PORTS = {
+    'daw': 1,       # MPK mini IV DAW Port - transport and bank buttons
+    'midi': 2,      # MPK mini IV MIDI Port - keys, knobs, pads, joystick
+    'software': 3,  # MPK mini IV Software Port - preset read replies
+}
+
+# Output port the preset SysEx goes to (1-indexed out_ports in the .luacodec)
+SYSEX_OUT_PORT = 1  # MPK mini IV Software Port
+
+# Preset sync on startup: remote_prepare_for_use requests the embedded
+# preset's slot, the reply is checksummed in remote_process_midi and the
+# preset is written only if it differs or no reply arrives within timeout_ms.
+PRESET_SYNC = {
+    'port': 'software',
+    'timeout_ms': 1000,
+}
+
+# Remote items, grouped by section. Order is the item index order in Reason.
+ITEMS = [
+    ("Keyboard", [
+        {'name': "Keyboard", 'input': "keyboard"},
+    ]),
+    ("Transport", [
+        {'name': "Play", 'input': "button"},
+        {'name': "Stop", 'input': "button"},
+        {'name': "Loop", 'input': "button"},
+        {'name': "Record", 'input': "button"},
+        {'name': "Quantize", 'input': "button"},
+        {'name': "Forward", 'input': "button"},
+        {'name': "Undo", 'input': "button"},
+        {'name': "Redo", 'input': "button"},
+        {'name': "Tap Tempo", 'input': "button"},
+        {'name': "Click", 'input': "button"},
+    ]),
+    ("Bank navigation", [
+        {'name': "Bank -", 'input': "button"},
+        {'name': "Bank +", 'input': "button"},
+    ]),
+    ("Joystick", [
+        {'name': "Pitch Bend", 'input': "value", 'min': 0, 'max': 16383},
+        {'name': "Mod Wheel", 'input': "value", 'min': 0, 'max': 127},
+    ]),
+    ("Knobs", [
+        {'name': f"Knob {i}", 'input': "value", 'min': 0, 'max': 127} for i in range(1, 9)
+    ]),
+]
+
+# Transport buttons dispatched in remote_process_midi through a table indexed
+# by CC number (channel 1, DAW Port). Kinds:
+#   toggle    - press alternates between item and off_item
+#   shift     - SHIFT modifier, selects shift_item on the other buttons
+#   press     - press sends item, or shift_item while SHIFT is held
+#   momentary - press and release pass through to item; SHIFT+press sends shift_item
+#   page      - SHIFT+press steps the knob page by step; without SHIFT the
+#               event falls through to the auto input on the same CC
+TRANSPORT = [
+    {'cc': 76, 'kind': 'toggle', 'item': "Play", 'off_item': "Stop", 'label': "Play/Stop toggle button"},
+    {'cc': 17, 'kind': 'shift', 'label': "SHIFT button"},
+    {'cc': 77, 'kind': 'press', 'item': "Record", 'shift_item': "Quantize", 'label': "Record button"},
+    {'cc': 73, 'kind': 'press', 'item': "Undo", 'shift_item': "Redo", 'label': "Undo button"},
+    {'cc': 11, 'kind': 'momentary', 'item': "Tap Tempo", 'shift_item': "Click", 'label': "Tap Tempo button"},
+    {'cc': 15, 'kind': 'page', 'step': -1, 'label': "Bank - (SHIFT: previous knob page)"},
+    {'cc': 16, 'kind': 'page', 'step': 1, 'label': "Bank + (SHIFT: next knob page)"},
+]
+
+# Knob pages for large devices. tools/build_pages.py writes the page index;
+# the generator defines "Page N Knob K" items for the longest device and
+# routes these knob CCs to the current page while one is selected.
+KNOB_PAGES = {
+    'index': 'knob_pages.json',
+    'port': 'midi',
+    'ccs': [24 + i for i in range(8)],
+}
+
+# Auto inputs handled by Reason's pattern matching, grouped by section.
+# Entries with 'cc' match "b0 <cc> xx"; the rest give a raw pattern.
+AUTO_INPUTS = [
+    ("Transport buttons come from DAW Port", [
+        {'cc': 74, 'name': "Loop", 'port': 'daw'},
+        {'cc': 78, 'name': "Forward", 'port': 'daw'},
+    ]),
+    ("Bank navigation buttons come from DAW Port", [
+        {'cc': 15, 'name': "Bank -", 'port': 'daw'},
+        {'cc': 16, 'name': "Bank +", 'port': 'daw'},
+    ]),
+    ("Joystick comes from MIDI Port", [
+        {'pattern': "e? xx yy", 'name': "Pitch Bend", 'value': "y*128 + x", 'port': 'midi'},
+        {'pattern': "b? 01 xx", 'name': "Mod Wheel", 'port': 'midi'},
+    ]),
+    ("Knobs (Channel 1, CC 24-31) come from MIDI Port", [
+        {'cc': 24 + i, 'name': f"Knob {i + 1}", 'port': 'midi'} for i in range(8)
+    ]),
+    ("Keyboard handles ALL notes including channel 10 pads (from MIDI Port)", [
+        {'pattern': "8? xx yy", 'name': "Keyboard", 'value': "0", 'note': "x", 'velocity': "64", 'port': 'midi'},
+        {'pattern': "9? xx 00", 'name': "Keyboard", 'value': "0", 'note': "x", 'velocity': "64", 'port': 'midi'},
+        {'pattern': "<100x>? yy zz", 'name': "Keyboard", 'port': 'midi'},
+    ]),
+]
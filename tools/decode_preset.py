@@ -4,11 +4,70 @@ MPK Mini IV Preset Decoder
 Decodes the SysEx preset data structure.
 """
 
+import argparse
 import json
+import os
+
+from generate_reason_preset import (KNOB_NAME_LENGTH, KNOB_OFFSET, KNOB_SIZE, PAD_NOTE_OFFSETS,
+                                    PRESET_NAME_LENGTH, load_presets)
+
+# Get directory where this script lives
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Single-byte settings: (section, field, offset)
+SETTINGS = [
+    ('global', 'pad_channel', 24),
+    ('global', 'key_channel', 25),
+    ('global', 'octave', 26),
+    ('global', 'transpose', 27),
+    ('global', 'arp_tempo', 28),
+    ('global', 'arp_mode', 29),
+    ('global', 'arp_time_div', 30),
+    ('global', 'arp_clock', 31),
+    ('global', 'arp_latch', 32),
+    ('global', 'arp_swing', 33),
+    ('global', 'arp_octave', 34),
+    ('joystick', 'x_positive', 35),
+    ('joystick', 'x_negative', 36),
+    ('joystick', 'y_positive', 37),
+    ('joystick', 'y_negative', 38),
+    ('aftertouch', 'mode', 43),
+    ('aftertouch', 'threshold', 44),
+    ('aftertouch', 'curve', 45),
+]
+
+# Each pad is 5 bytes: [note, program, cc, ?, ?]
+PAD_FIELDS = [('note', 0), ('program', 1), ('cc', 2)]
+
+# Each knob is 20 bytes: [cc, min, max, mode, name (16)]
+KNOB_FIELDS = [('cc', 0, 1), ('min', 1, 1), ('max', 2, 1), ('mode', 3, 1),
+               ('name', 4, KNOB_NAME_LENGTH)]
+
+
+def preset_fields():
+    """Return (field, offset, size) for each decoded field, in byte order.
+
+    Field names are dotted paths into decode_preset()'s result with 1-based
+    pad/knob numbers: "name", "global.arp_tempo", "pads.3.note", "knobs.3.cc".
+    """
+    fields = [('header.length', 4, 2), ('header.preset_number', 6, 1),
+              ('name', 7, PRESET_NAME_LENGTH)]
+    fields += [(f"{section}.{name}", offset, 1) for section, name, offset in SETTINGS]
+    for i, pad_offset in enumerate(PAD_NOTE_OFFSETS):
+        fields += [(f"pads.{i + 1}.{name}", pad_offset + delta, 1) for name, delta in PAD_FIELDS]
+    for i in range(8):
+        knob_offset = KNOB_OFFSET + i * KNOB_SIZE
+        fields += [(f"knobs.{i + 1}.{name}", knob_offset + delta, size)
+                   for name, delta, size in KNOB_FIELDS]
+    return sorted(fields, key=lambda f: f[1])
+
 
-# Load preset data
-with open('presets_raw.json', 'r') as f:
-    presets = json.load(f)
+def field_value(decoded, field):
+    """Look up a preset_fields() name in a decode_preset() result."""
+    value = decoded
+    for part in field.split('.'):
+        value = value[int(part) - 1] if isinstance(value, list) else value[part]
+    return value
 
 def decode_preset(data):
     """Decode a single preset."""
@@ -58,22 +117,16 @@ def decode_preset(data):
         'curve': data[45],
     }
 
-    # Pads section (bytes 85-160, 16 pads x ~5 bytes each)
-    # Each pad: note, PC, CC, mode + extra
+    # Pads section (bytes 81-160, 16 pads x 5 bytes each)
+    # Each pad: note, program, CC, then two bytes not yet decoded
     result['pads'] = []
-    pad_start = 85
-
-    # Looking at the hex dump pattern, each pad seems to be 5 bytes
-    # Pattern: [idx] [note] [01] [0E] [next_note]
-    # Let me try a different interpretation - looking for note values
-    for i in range(16):
-        # Find notes in the data - they should be in a predictable pattern
-        # Based on hex dump: notes at offsets 87, 91, 95, 99, ...
-        offset = 87 + (i * 4)
-        if offset < len(data):
+    for i, offset in enumerate(PAD_NOTE_OFFSETS):
+        if offset + 2 < len(data):
             pad = {
                 'pad_number': i + 1,
                 'note': data[offset],
+                'program': data[offset + 1],
+                'cc': data[offset + 2],
                 'bank': 'A' if i < 8 else 'B',
             }
             result['pads'].append(pad)
@@ -101,49 +154,62 @@ def decode_preset(data):
 
     return result
 
-# Decode all presets
-print("=" * 70)
-print("MPK Mini IV Preset Decoder")
-print("=" * 70)
-
-for preset_num, data in sorted(presets.items(), key=lambda x: int(x[0])):
-    decoded = decode_preset(data)
-
-    print(f"\n{'='*70}")
-    print(f"PRESET {decoded['header']['preset_number']}: {decoded['name']}")
-    print(f"{'='*70}")
-
-    print(f"\nGlobal Settings:")
-    print(f"  Pad MIDI Channel: {decoded['global']['pad_channel']}")
-    print(f"  Keys/Knobs MIDI Channel: {decoded['global']['key_channel']}")
-    print(f"  Octave: {decoded['global']['octave']:+d}")
-    print(f"  Transpose: {decoded['global']['transpose']:+d} semitones")
-    print(f"  Arpeggiator Tempo: {decoded['global']['arp_tempo']} BPM")
-
-    print(f"\nKnobs:")
-    print(f"  {'#':<4} {'CC':<6} {'Min':<5} {'Max':<5} {'Name':<16}")
-    print(f"  {'-'*4} {'-'*6} {'-'*5} {'-'*5} {'-'*16}")
-    for knob in decoded['knobs']:
-        print(f"  {knob['knob_number']:<4} {knob['cc']:<6} {knob['min']:<5} {knob['max']:<5} {knob['name']:<16}")
-
-# Save decoded data
-decoded_all = {}
-for preset_num, data in presets.items():
-    decoded_all[preset_num] = decode_preset(data)
-
-with open('presets_decoded.json', 'w') as f:
-    json.dump(decoded_all, f, indent=2)
-
-print(f"\n\nSaved decoded presets to presets_decoded.json")
-
-# Print raw analysis
-print("\n" + "=" * 70)
-print("RAW DATA ANALYSIS - Preset 1")
-print("=" * 70)
-
-data = presets['1']
-print("\nLooking for pad note values in data:")
-# Notes should be MIDI note numbers (0-127), looking for a sequence
-for i in range(50, 160):
-    if 30 <= data[i] <= 80:  # Reasonable note range
-        print(f"  Offset {i:3d} (0x{i:02X}): {data[i]:3d} (note {data[i]})")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MPK Mini IV Preset Decoder')
+    parser.add_argument('--input', '-i', help='Raw presets JSON (default: presets_raw.json)')
+    parser.add_argument('--no-save', action='store_true',
+                        help="Don't write presets_decoded.json")
+    args = parser.parse_args(argv)
+
+    presets = load_presets(args.input)
+
+    # Decode all presets
+    print("=" * 70)
+    print("MPK Mini IV Preset Decoder")
+    print("=" * 70)
+
+    for preset_num, data in sorted(presets.items(), key=lambda x: int(x[0])):
+        decoded = decode_preset(data)
+
+        print(f"\n{'='*70}")
+        print(f"PRESET {decoded['header']['preset_number']}: {decoded['name']}")
+        print(f"{'='*70}")
+
+        print(f"\nGlobal Settings:")
+        print(f"  Pad MIDI Channel: {decoded['global']['pad_channel']}")
+        print(f"  Keys/Knobs MIDI Channel: {decoded['global']['key_channel']}")
+        print(f"  Octave: {decoded['global']['octave']:+d}")
+        print(f"  Transpose: {decoded['global']['transpose']:+d} semitones")
+        print(f"  Arpeggiator Tempo: {decoded['global']['arp_tempo']} BPM")
+
+        print(f"\nKnobs:")
+        print(f"  {'#':<4} {'CC':<6} {'Min':<5} {'Max':<5} {'Name':<16}")
+        print(f"  {'-'*4} {'-'*6} {'-'*5} {'-'*5} {'-'*16}")
+        for knob in decoded['knobs']:
+            print(f"  {knob['knob_number']:<4} {knob['cc']:<6} {knob['min']:<5} {knob['max']:<5} {knob['name']:<16}")
+
+    # Save decoded data
+    if not args.no_save:
+        decoded_all = {}
+        for preset_num, data in presets.items():
+            decoded_all[preset_num] = decode_preset(data)
+
+        with open(os.path.join(SCRIPT_DIR, 'presets_decoded.json'), 'w') as f:
+            json.dump(decoded_all, f, indent=2)
+
+        print(f"\n\nSaved decoded presets to presets_decoded.json")
+
+    # Print raw analysis
+    print("\n" + "=" * 70)
+    print("RAW DATA ANALYSIS - Preset 1")
+    print("=" * 70)
+
+    data = presets['1']
+    print("\nLooking for pad note values in data:")
+    # Notes should be MIDI note numbers (0-127), looking for a sequence
+    for i in range(50, 160):
+        if 30 <= data[i] <= 80:  # Reasonable note range
+            print(f"  Offset {i:3d} (0x{i:02X}): {data[i]:3d} (note {data[i]})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Generate the MPK Mini IV Reason Remote codec from codec_spec.py.
+Transport buttons are dispatched through a Lua table indexed by CC number,
+knob pages come from the index tools/build_pages.py writes, and the slot 2
+preset SysEx is rebuilt from generate_reason_preset.py together with the
+checksum the codec compares the controller's copy against.
+"""
+
+import argparse
+import os
+import sys
+
+import codec_spec
+from build_pages import load_page_index, page_control, page_count
+from generate_reason_preset import reason_preset_hex
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CODEC_PATH = os.path.join(SCRIPT_DIR, '..', 'reason_remote', 'MPK mini IV.lua')
+
+DISPATCH_KINDS = {
+    'toggle': ('item', 'off_item'),
+    'shift': (),
+    'press': ('item', 'shift_item'),
+    'momentary': ('item', 'shift_item'),
+    'page': (),
+}
+
+# Kinds that only consume events while SHIFT is held, so the same CC can
+# also be an auto input
+PASS_THROUGH_KINDS = {'page'}
+
+# Preset checksum: position-weighted sum, small enough for Lua 5.1 doubles
+CHECKSUM_FACTOR = 31
+CHECKSUM_MODULUS = 1000003
+
+ITEM_KEYS = ['name', 'input', 'min', 'max']
+INPUT_KEYS = ['pattern', 'name', 'value', 'note', 'velocity', 'port']
+
+
+def lua_value(value):
+    """Format a Python scalar as a Lua literal."""
+    if isinstance(value, str):
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return str(value)
+
+
+def lua_table(entry, keys):
+    """Format a dict as a single-line Lua table, keeping key order."""
+    fields = [f"{k}={lua_value(entry[k])}" for k in keys if k in entry]
+    return "{ " + ", ".join(fields) + " }"
+
+
+def page_item_names(spec, pages):
+    """Return the "Page N Knob K" item names the codec defines in a loop."""
+    knobs = len(spec.KNOB_PAGES['ccs'])
+    return [page_control(page, knob) for page in range(1, pages + 1) for knob in range(1, knobs + 1)]
+
+
+def codec_item_names(spec=codec_spec, page_index=None):
+    """Return every item name the generated codec defines, page items included."""
+    if page_index is None:
+        page_index = load_page_index(os.path.join(SCRIPT_DIR, spec.KNOB_PAGES['index']))
+    names = [item['name'] for _, items in spec.ITEMS for item in items]
+    return names + page_item_names(spec, page_count(page_index))
+
+
+def validate_spec(spec, pages=0):
+    """Check the spec for references that would fail silently in Reason."""
+    names = [item['name'] for _, items in spec.ITEMS for item in items]
+    names += page_item_names(spec, pages)
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate item names in spec")
+
+    seen_ccs = set()
+    for button in spec.TRANSPORT:
+        cc = button['cc']
+        if not 0 <= cc <= 127:
+            raise ValueError(f"CC {cc} out of range")
+        if cc in seen_ccs:
+            raise ValueError(f"CC {cc} dispatched twice")
+        seen_ccs.add(cc)
+        kind = button['kind']
+        if kind not in DISPATCH_KINDS:
+            raise ValueError(f"CC {cc}: unknown kind '{kind}'")
+        for key in DISPATCH_KINDS[kind]:
+            if button.get(key) not in names:
+                raise ValueError(f"CC {cc}: {key} '{button.get(key)}' is not a defined item")
+        if kind == 'page' and not isinstance(button.get('step'), int):
+            raise ValueError(f"CC {cc}: page entries need an integer step")
+
+    if spec.PRESET_SYNC['port'] not in spec.PORTS:
+        raise ValueError(f"Preset sync: unknown port '{spec.PRESET_SYNC['port']}'")
+
+    paged = spec.KNOB_PAGES
+    if paged['port'] not in spec.PORTS:
+        raise ValueError(f"Knob pages: unknown port '{paged['port']}'")
+    if not 1 <= len(paged['ccs']) <= 8 or len(set(paged['ccs'])) != len(paged['ccs']):
+        raise ValueError("Knob pages need 1-8 distinct CCs")
+    pass_through = {b['cc'] for b in spec.TRANSPORT if b['kind'] in PASS_THROUGH_KINDS}
+
+    for _, inputs in spec.AUTO_INPUTS:
+        for entry in inputs:
+            if entry['name'] not in names:
+                raise ValueError(f"Auto input '{entry['name']}' is not a defined item")
+            if entry['port'] not in spec.PORTS:
+                raise ValueError(f"Auto input '{entry['name']}': unknown port '{entry['port']}'")
+            if ('cc' in entry and entry['cc'] in seen_ccs - pass_through
+                    and entry['port'] == 'daw'):
+                raise ValueError(f"CC {entry['cc']} is both dispatched and an auto input")
+
+
+def render_items(spec):
+    lines = []
+    for section, items in spec.ITEMS:
+        lines.append(f"        -- {section}")
+        for item in items:
+            lines.append(f"        {lua_table(item, ITEM_KEYS)},")
+        lines.append("")
+    return lines
+
+
+def render_inputs(spec):
+    lines = []
+    for section, inputs in spec.AUTO_INPUTS:
+        port = spec.PORTS[inputs[0]['port']]
+        lines.append(f"        -- {section} (port={port})")
+        for entry in inputs:
+            entry = dict(entry, port=spec.PORTS[entry['port']])
+            if 'cc' in entry:
+                entry['pattern'] = f"b0 {entry['cc']:02x} xx"
+                lines.append(f"        {lua_table(entry, INPUT_KEYS)},  -- CC {entry['cc']}")
+            else:
+                lines.append(f"        {lua_table(entry, INPUT_KEYS)},")
+        lines.append("")
+    return lines[:-1]
+
+
+def render_dispatch(spec):
+    lines = []
+    for button in sorted(spec.TRANSPORT, key=lambda b: b['cc']):
+        fields = {'kind': button['kind']}
+        for key in DISPATCH_KINDS[button['kind']]:
+            fields[key] = button[key]
+        if 'step' in button:
+            fields['step'] = button['step']
+        table = lua_table(fields, ['kind', 'item', 'shift_item', 'off_item', 'step'])
+        lines.append(f"    [0x{button['cc']:02x}] = {table},  -- CC {button['cc']} = {button['label']}")
+    return lines
+
+
+def preset_checksum(sysex):
+    """Checksum the preset data of a write or read reply (bytes after the length, before F7)."""
+    checksum = 0
+    for b in sysex[7:-1]:
+        checksum = (checksum * CHECKSUM_FACTOR + b) % CHECKSUM_MODULUS
+    return checksum
+
+
+def preset_request(sysex):
+    """Return the read request for the slot a preset write targets."""
+    return [0xF0, 0x47, 0x00, 0x5D, 0x66, 0x00, 0x01, sysex[7], 0xF7]
+
+
+def render_knob_ccs(spec):
+    ccs = spec.KNOB_PAGES['ccs']
+    return ", ".join(f"[0x{cc:02x}]={knob}" for knob, cc in enumerate(ccs, 1))
+
+
+def render_codec(spec=codec_spec, preset_hex=None, page_index=None):
+    """Return the full Lua codec source for a spec."""
+    if page_index is None:
+        page_index = load_page_index(os.path.join(SCRIPT_DIR, spec.KNOB_PAGES['index']))
+    pages = page_count(page_index)
+    validate_spec(spec, pages)
+    preset_hex = preset_hex or reason_preset_hex()
+    preset = [int(b, 16) for b in preset_hex.split()]
+    request_hex = ' '.join(f'{b:02X}' for b in preset_request(preset))
+    daw_port = spec.PORTS['daw']
+    reply_port = spec.PORTS[spec.PRESET_SYNC['port']]
+    knob_port = spec.PORTS[spec.KNOB_PAGES['port']]
+    knobs = len(spec.KNOB_PAGES['ccs'])
+
+    out = [
+        "-- Generated by tools/generate_codec.py from tools/codec_spec.py.",
+        "-- Do not edit by hand: change the spec and regenerate.",
+        "",
+        "-- Track SHIFT state for modifier functions",
+        "g_shift_held = false",
+        "",
+        "-- Transport buttons indexed by CC number (DAW Port, channel 1).",
+        "-- remote_init resolves item names to indices and kinds to handlers,",
+        "-- so remote_process_midi does one table lookup per event.",
+        "g_cc_dispatch = {",
+        *render_dispatch(spec),
+        "}",
+        "",
+        "-- Toggle entries indexed by item, for remote_set_state",
+        "g_toggle_by_item = {}",
+        "",
+        "-- Preset sync: remote_prepare_for_use requests the slot, remote_process_midi",
+        "-- checksums the reply and remote_deliver_midi writes the preset only on a",
+        "-- mismatch or when no reply arrives in time.",
+        f"g_preset_request = \"{request_hex}\"",
+        f"g_preset_slot = {preset[7]}",
+        f"g_preset_length = {len(preset)}",
+        f"g_preset_checksum = {preset_checksum(preset)}",
+        f"g_preset_timeout_ms = {spec.PRESET_SYNC['timeout_ms']}",
+        "g_preset_state = \"idle\"  -- idle, requested, write, done",
+        "g_preset_requested_at = 0",
+        "",
+        "-- Knob pages: page 0 is the scope's own Knob 1-8 mapping, pages 1..N",
+        "-- use the \"Page N Knob K\" items. g_page_knobs[page][knob] holds item",
+        "-- indices, so a page switch or a paged knob event is one table lookup.",
+        "g_page = 0",
+        f"g_page_count = {pages}",
+        "g_page_knobs = {}",
+        f"g_knob_by_cc = {{ {render_knob_ccs(spec)} }}",
+        "",
+        "local function send_button(event, item_index, value)",
+        "    remote.handle_input({ time_stamp=event.time_stamp, item=item_index, value=value })",
+        "end",
+        "",
+        "-- True for a preset read reply (F0 47 00 5D 67 hi lo slot ...) for our slot",
+        "local function is_preset_reply(event)",
+        "    return event[1] == 0xF0 and event[2] == 0x47 and event[3] == 0x00",
+        "        and event[4] == 0x5D and event[5] == 0x67 and event[8] == g_preset_slot",
+        "end",
+        "",
+        "-- Same checksum as preset_checksum() in tools/generate_codec.py",
+        "local function preset_checksum(event)",
+        "    local checksum = 0",
+        "    for i = 8, event.size - 1 do",
+        f"        checksum = (checksum * {CHECKSUM_FACTOR} + event[i]) % {CHECKSUM_MODULUS}",
+        "    end",
+        "    return checksum",
+        "end",
+        "",
+        "-- Handlers per dispatch kind; return true when the event is consumed",
+        "g_cc_handlers = {",
+        "    toggle = function(entry, value, event)",
+        "        if value == 0 then",
+        "            return false",
+        "        end",
+        "        entry.on = not entry.on",
+        "        if entry.on then",
+        "            send_button(event, entry.item_index, 1)",
+        "        else",
+        "            send_button(event, entry.off_index, 1)",
+        "        end",
+        "        return true",
+        "    end,",
+        "",
+        "    shift = function(entry, value, event)",
+        "        g_shift_held = (value > 0)",
+        "        return true",
+        "    end,",
+        "",
+        "    press = function(entry, value, event)",
+        "        if value == 0 then",
+        "            return false",
+        "        end",
+        "        if g_shift_held then",
+        "            send_button(event, entry.shift_index, 1)",
+        "        else",
+        "            send_button(event, entry.item_index, 1)",
+        "        end",
+        "        return true",
+        "    end,",
+        "",
+        "    momentary = function(entry, value, event)",
+        "        if g_shift_held and value > 0 then",
+        "            send_button(event, entry.shift_index, 1)",
+        "        else",
+        "            send_button(event, entry.item_index, value)",
+        "        end",
+        "        return true",
+        "    end,",
+        "",
+        "    page = function(entry, value, event)",
+        "        if not g_shift_held then",
+        "            return false",
+        "        end",
+        "        if value > 0 then",
+        "            -- A page exists for the focused device when its first knob is mapped",
+        "            local page = g_page + entry.step",
+        "            if page == 0 or (page >= 1 and page <= g_page_count",
+        "                    and remote.is_item_enabled(g_page_knobs[page][1])) then",
+        "                g_page = page",
+        "            end",
+        "        end",
+        "        return true",
+        "    end,",
+        "}",
+        "",
+        "function remote_init()",
+        "    local items = {",
+        *render_items(spec),
+        "        -- Pads are handled as Keyboard notes (channel 10)",
+        "        -- They pass through as MIDI notes to Kong/Redrum",
+        "    }",
+        "",
+        "    -- Knob pages, appended after the fixed items: \"Page N Knob K\"",
+        "    for page = 1, g_page_count do",
+        "        local knobs = {}",
+        f"        for knob = 1, {knobs} do",
+        "            table.insert(items, { name=\"Page \" .. page .. \" Knob \" .. knob,",
+        "                                  input=\"value\", min=0, max=127 })",
+        "            knobs[knob] = #items",
+        "        end",
+        "        g_page_knobs[page] = knobs",
+        "    end",
+        "    remote.define_items(items)",
+        "",
+        "    -- Build index lookup",
+        "    g_items = {}",
+        "    for i, item in ipairs(items) do",
+        "        g_items[item.name] = i",
+        "    end",
+        "",
+        "    -- Resolve dispatch entries once so per-event work stays constant",
+        "    for cc, entry in pairs(g_cc_dispatch) do",
+        "        entry.handler = g_cc_handlers[entry.kind]",
+        "        entry.item_index = entry.item and g_items[entry.item]",
+        "        entry.shift_index = entry.shift_item and g_items[entry.shift_item]",
+        "        entry.off_index = entry.off_item and g_items[entry.off_item]",
+        "        if entry.kind == \"toggle\" then",
+        "            entry.on = false",
+        "            g_toggle_by_item[entry.item_index] = entry",
+        "        end",
+        "    end",
+        "",
+        "    local inputs = {",
+        *render_inputs(spec),
+        "    }",
+        "    remote.define_auto_inputs(inputs)",
+        "end",
+        "",
+        "function remote_probe()",
+        "    local controlRequest = \"F0 7E 7F 06 01 F7\"",
+        "    local controlResponse = \"F0 7E 7F 06 02 47 5D 00 19" + " ??" * 23 + " F7\"",
+        "    return {",
+        "        request = controlRequest,",
+        "        response = controlResponse",
+        "    }",
+        "end",
+        "",
+        "function remote_prepare_for_use()",
+        "    -- Ask for preset slot 2; remote_deliver_midi writes the Kong-compatible",
+        "    -- preset only if the reply differs from it or does not arrive",
+        "    -- This remaps pads to C1-D#2 (notes 36-51) for Kong/Redrum compatibility",
+        "    -- Pads 1-16 on controller map directly to Kong/Redrum pads 1-16",
+        "    -- NOTE: User must select preset 2 on controller (PROG SELECT + Pad 2)",
+        "    -- NOTE: Arpeggiator clock source cannot be set via SysEx (firmware limitation)",
+        "    --       User must manually set External clock: SHIFT + ARP → Clock → EXT",
+        "    g_preset_state = \"requested\"",
+        "    g_preset_requested_at = remote.get_time_ms()",
+        "    return {",
+        "        remote.make_midi(g_preset_request),",
+        "    }",
+        "end",
+        "",
+        "function remote_deliver_midi(max_bytes, port)",
+        f"    if port ~= {spec.SYSEX_OUT_PORT} then",
+        "        return nil",
+        "    end",
+        "    if g_preset_state == \"requested\"",
+        "            and remote.get_time_ms() - g_preset_requested_at >= g_preset_timeout_ms then",
+        "        g_preset_state = \"write\"",
+        "    end",
+        "    if g_preset_state == \"write\" and max_bytes >= g_preset_length then",
+        "        g_preset_state = \"done\"",
+        "        return {",
+        f"            remote.make_midi(\"{preset_hex}\"),",
+        "        }",
+        "    end",
+        "    return nil",
+        "end",
+        "",
+        "function remote_process_midi(event)",
+        "    -- Channel 10 notes (pads) pass through to auto_inputs -> Keyboard",
+        "    -- Don't intercept them here - let keyboard patterns handle them",
+        "",
+        f"    -- Preset read reply (Software Port, port={reply_port})",
+        f"    if event.port == {reply_port} then",
+        "        if g_preset_state == \"requested\" and is_preset_reply(event) then",
+        "            if event.size == g_preset_length and preset_checksum(event) == g_preset_checksum then",
+        "                g_preset_state = \"done\"",
+        "            else",
+        "                g_preset_state = \"write\"",
+        "            end",
+        "        end",
+        "        return true",
+        "    end",
+        "",
+        f"    -- Transport CC handling - only process events from DAW Port (port={daw_port})",
+        "    -- Note: event.port is 1-indexed in Reason Remote",
+        f"    if event.port == {daw_port} then",
+        "        local ret = remote.match_midi(\"b0 xx yy\", event)",
+        "        if ret then",
+        "            local entry = g_cc_dispatch[ret.x]",
+        "            if entry then",
+        "                return entry.handler(entry, ret.y, event)",
+        "            end",
+        "        end",
+        "    end",
+        "",
+        f"    -- Knobs on a selected page (MIDI Port, port={knob_port}); page 0 falls through",
+        "    -- to the Knob 1-8 auto inputs",
+        f"    if g_page > 0 and event.port == {knob_port} then",
+        "        local ret = remote.match_midi(\"b0 xx yy\", event)",
+        "        local knob = ret and g_knob_by_cc[ret.x]",
+        "        if knob then",
+        "            local knobs = g_page_knobs[g_page]",
+        "            if remote.is_item_enabled(knobs[knob]) then",
+        "                send_button(event, knobs[knob], ret.y)",
+        "                return true",
+        "            end",
+        "            if not remote.is_item_enabled(knobs[1]) then",
+        "                -- Focus moved to a device without this page",
+        "                g_page = 0",
+        "                return false",
+        "            end",
+        "            -- Unused knob on a partly filled page",
+        "            return true",
+        "        end",
+        "    end",
+        "",
+        "    return false",
+        "end",
+        "",
+        "function remote_set_state(changed_items)",
+        "    -- Track toggle state (Play/Stop) from Reason",
+        "    for i, item_index in ipairs(changed_items) do",
+        "        local entry = g_toggle_by_item[item_index]",
+        "        if entry then",
+        "            local state = remote.get_item_state(item_index)",
+        "            if state and state.value then",
+        "                entry.on = (state.value > 0)",
+        "            end",
+        "        end",
+        "    end",
+        "end",
+    ]
+    return "\n".join(out) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the MPK Mini IV Lua codec')
+    parser.add_argument('--output', '-o', default=CODEC_PATH, help='Codec path to write')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit non-zero if the codec on disk is out of date')
+    args = parser.parse_args(argv)
+
+    source = render_codec()
+    args.output = os.path.normpath(args.output)
+
+    if args.check:
+        with open(args.output, 'r', encoding='utf-8') as f:
+            current = f.read()
+        if current != source:
+            print(f"{args.output} is out of date; run tools/generate_codec.py", file=sys.stderr)
+            sys.exit(1)
+        print(f"{args.output} is up to date")
+        return
+
+    with open(args.output, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(source)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,13 +10,6 @@ import os
 # Get directory where this script lives
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Load the DAW preset as base
-with open(os.path.join(SCRIPT_DIR, 'presets_raw.json'), 'r') as f:
-    presets = json.load(f)
-
-# Use preset 1 (DAW) as base
-base_preset = presets['1'].copy()
-
 # Pad note offsets (verified from raw data analysis)
 # In the raw SysEx data (including header), pad notes are at indices:
 # 81, 86, 91, 96, 101, 106, 111, 116, 121, 126, 131, 136, 141, 146, 151, 156
@@ -27,68 +20,137 @@ PAD_NOTE_OFFSETS = [81 + (i * 5) for i in range(16)]
 # This maps pads 1-16 to sequential notes starting at C1
 KONG_PAD_NOTES = list(range(36, 52))  # 36, 37, 38, ... 51
 
-print("=" * 70)
-print("MPK Mini IV - Reason Preset Generator")
-print("=" * 70)
-
-print("\nOriginal pad notes:")
-for i, offset in enumerate(PAD_NOTE_OFFSETS):
-    print(f"  Pad {i+1:2d}: Note {base_preset[offset]:3d} (offset {offset})")
-
-print("\nNew Kong-compatible pad notes:")
-for i, (offset, note) in enumerate(zip(PAD_NOTE_OFFSETS, KONG_PAD_NOTES)):
-    base_preset[offset] = note
-    print(f"  Pad {i+1:2d}: Note {note:3d} -> {['C','C#','D','D#','E','F','F#','G','G#','A','A#','B'][note % 12]}{note // 12 - 1}")
-
-# Change preset name to "Reason" (bytes 7-23)
-name = "Reason"
-name_bytes = name.encode('ascii') + b'\x00' * (17 - len(name))
-for i, b in enumerate(name_bytes):
-    base_preset[7 + i] = b
-
-# Ensure keyboard channel is 1 (index 0)
-base_preset[25] = 0  # key_channel = 1
-
-# Set preset slot to 2 (USER1 renamed to "Reason")
-base_preset[6] = 2
-
-# Generate the full SysEx message
-# Format: F0 47 00 5D 67 [length_hi] [length_lo] [preset_data...] F7
-# preset_data starts from byte 6 (preset_num) in the raw data
-
-preset_data = base_preset[6:]  # Data from preset_num onwards
-data_length = len(preset_data)
-length_hi = (data_length >> 7) & 0x7F
-length_lo = data_length & 0x7F
-
-# Build SysEx for writing to preset slot 2
-sysex = [0xF0, 0x47, 0x00, 0x5D, 0x67, length_hi, length_lo] + preset_data + [0xF7]
-
-# Convert to hex string for Reason Remote
-hex_string = ' '.join(f'{b:02X}' for b in sysex)
-
-print("\n" + "=" * 70)
-print("SysEx for Reason Remote (remote.make_midi):")
-print("=" * 70)
-print(f"\nLength: {len(sysex)} bytes")
-print(f"\nHex string (for Lua codec):")
-print(f'"{hex_string}"')
-
-# Also save to file for reference
-output_path = os.path.join(SCRIPT_DIR, 'reason_preset_sysex.txt')
-with open(output_path, 'w') as f:
-    f.write(hex_string)
-print(f"\nSaved to {output_path}")
-
-# Generate Lua code snippet
-print("\n" + "=" * 70)
-print("Lua code for codec (add to MPK mini IV.lua):")
-print("=" * 70)
-print('''
-function remote_prepare_for_use()
-    return {
-        -- Send Kong-compatible preset to MPK Mini IV RAM
-        remote.make_midi("''' + hex_string + '''"),
-    }
-end
-''')
+# Knobs start at index 161, 20 bytes each: [cc, min, max, mode, name (16 bytes)]
+KNOB_OFFSET = 161
+KNOB_SIZE = 20
+KNOB_NAME_LENGTH = 16
+
+PRESET_NAME_LENGTH = 17  # bytes 7-23, null-terminated
+PRESET_LENGTH = 321      # raw preset including the 6-byte header
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+
+def note_name(note):
+    """Return a note number as a name like C1."""
+    return f"{NOTE_NAMES[note % 12]}{note // 12 - 1}"
+
+
+def load_presets(path=None):
+    """Load the raw preset dump captured from the controller."""
+    path = path or os.path.join(SCRIPT_DIR, 'presets_raw.json')
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def set_preset_name(preset, name):
+    """Write the preset name (bytes 7-23), null padded."""
+    name_bytes = name.encode('ascii')[:PRESET_NAME_LENGTH - 1]
+    preset[7:7 + PRESET_NAME_LENGTH] = name_bytes + b'\x00' * (PRESET_NAME_LENGTH - len(name_bytes))
+
+
+def set_knob_name(preset, knob, name):
+    """Write the 16-byte name field of knob 0-7, null padded."""
+    offset = KNOB_OFFSET + knob * KNOB_SIZE + 4
+    name_bytes = name.encode('ascii')[:KNOB_NAME_LENGTH]
+    preset[offset:offset + KNOB_NAME_LENGTH] = name_bytes + b'\x00' * (KNOB_NAME_LENGTH - len(name_bytes))
+
+
+def build_reason_preset(base_preset, name="Reason", pad_notes=KONG_PAD_NOTES, slot=2):
+    """Return a copy of base_preset with Kong pad notes, name and slot applied."""
+    preset = list(base_preset)
+
+    for offset, note in zip(PAD_NOTE_OFFSETS, pad_notes):
+        preset[offset] = note
+
+    # Preset name (bytes 7-23)
+    set_preset_name(preset, name)
+
+    # Ensure keyboard channel is 1 (index 0)
+    preset[25] = 0  # key_channel = 1
+
+    # Set preset slot (USER1 = slot 2 renamed to "Reason")
+    preset[6] = slot
+    return preset
+
+
+def encode_sysex(preset):
+    """Encode a preset as a complete write message.
+
+    Format: F0 47 00 5D 67 [length_hi] [length_lo] [preset_data...] F7
+    preset_data starts from byte 6 (preset_num) in the raw data.
+    """
+    preset_data = list(preset[6:])  # Data from preset_num onwards
+    data_length = len(preset_data)
+    length_hi = (data_length >> 7) & 0x7F
+    length_lo = data_length & 0x7F
+    return [0xF0, 0x47, 0x00, 0x5D, 0x67, length_hi, length_lo] + preset_data + [0xF7]
+
+
+def validate_sysex(sysex):
+    """Raise ValueError unless sysex is a well-formed preset write message."""
+    if sysex[:5] != [0xF0, 0x47, 0x00, 0x5D, 0x67] or sysex[-1] != 0xF7:
+        raise ValueError("not an MPK Mini IV preset write")
+    body = sysex[1:-1]
+    if len(body) != PRESET_LENGTH:
+        raise ValueError(f"preset is {len(body)} bytes, expected {PRESET_LENGTH}")
+    if (body[4] << 7) | body[5] != len(body) - 6:
+        raise ValueError("length field does not match the data")
+    if any(not 0 <= b <= 0x7F for b in body):
+        raise ValueError("data byte outside 0-127")
+    if not 1 <= body[6] <= 8:
+        raise ValueError(f"preset slot {body[6]} outside 1-8")
+
+
+def to_hex(data):
+    """Format bytes as the space-separated hex string remote.make_midi() takes."""
+    return ' '.join(f'{b:02X}' for b in data)
+
+
+def reason_preset_hex(presets=None):
+    """Build the slot 2 "Reason" preset from preset 1 and return it as hex."""
+    presets = presets or load_presets()
+    return to_hex(encode_sysex(build_reason_preset(presets['1'])))
+
+
+def main():
+    # Use preset 1 (DAW) as base
+    base_preset = load_presets()['1']
+
+    print("=" * 70)
+    print("MPK Mini IV - Reason Preset Generator")
+    print("=" * 70)
+
+    print("\nOriginal pad notes:")
+    for i, offset in enumerate(PAD_NOTE_OFFSETS):
+        print(f"  Pad {i+1:2d}: Note {base_preset[offset]:3d} (offset {offset})")
+
+    print("\nNew Kong-compatible pad notes:")
+    for i, note in enumerate(KONG_PAD_NOTES):
+        print(f"  Pad {i+1:2d}: Note {note:3d} -> {note_name(note)}")
+
+    # Build SysEx for writing to preset slot 2
+    sysex = encode_sysex(build_reason_preset(base_preset))
+
+    # Convert to hex string for Reason Remote
+    hex_string = to_hex(sysex)
+
+    print("\n" + "=" * 70)
+    print("SysEx for Reason Remote (remote.make_midi):")
+    print("=" * 70)
+    print(f"\nLength: {len(sysex)} bytes")
+    print(f"\nHex string (for Lua codec):")
+    print(f'"{hex_string}"')
+
+    # Also save to file for reference
+    output_path = os.path.join(SCRIPT_DIR, 'reason_preset_sysex.txt')
+    with open(output_path, 'w') as f:
+        f.write(hex_string)
+    print(f"\nSaved to {output_path}")
+
+    print("\nThe codec embeds this preset automatically:")
+    print("  python tools/generate_codec.py")
+
+
+if __name__ == '__main__':
+    main()
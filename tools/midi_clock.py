@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+MIDI clock source for testing the arpeggiator on external clock.
+Sends 24 ppqn Timing Clock (0xF8) plus Start/Stop/Continue to a port.
+
+Every tick has an absolute deadline on the perf_counter clock, computed
+from the last tempo or swing change, so a late tick does not delay the
+ones after it and error never builds up across beats. The sender sleeps
+until shortly before each deadline and spins for the rest. Tempo and
+swing can change while running; a jitter report shows how late ticks
+were sent.
+
+    python tools/mpk.py clock --bpm 120
+    python tools/mpk.py clock --virtual "MPK Clock" --swing 58
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import tracing
+
+PPQN = 24
+TICKS_PER_16TH = PPQN // 4
+
+# Sleep until this long before a deadline, then spin; covers sleep overshoot
+SPIN_NS = 1_500_000
+
+# A tick later than this re-anchors the schedule at the current time
+# instead of sending a burst of catch-up ticks (e.g. after a system stall)
+MAX_LATENESS_TICKS = PPQN
+
+MIN_BPM, MAX_BPM = 20.0, 300.0
+MIN_SWING, MAX_SWING = 50.0, 75.0
+
+
+def _mido():
+    try:
+        import mido
+    except ImportError:
+        sys.exit("ERROR: mido is required to send clock (pip install mido python-rtmidi)")
+    return mido
+
+
+class ClockSchedule:
+    """Absolute tick deadlines for a tempo and swing that can change.
+
+    Swing delays every second 16th note: at 50% the 16ths are straight, at
+    66.7% they are triplet-feel. Deadlines are measured from an anchor (a
+    tick and its time) that moves only when the tempo or swing changes, so
+    deadline(n) is a direct calculation, not a sum of tick periods.
+    """
+
+    def __init__(self, bpm=120.0, swing=50.0, start_ns=0):
+        self.bpm = bpm
+        self.swing = swing
+        self.anchor_tick = 0
+        self.anchor_ns = start_ns
+
+    @property
+    def period_ns(self):
+        """Length of one straight tick in nanoseconds."""
+        return 60e9 / (self.bpm * PPQN)
+
+    def position(self, tick):
+        """Return a tick's position in straight ticks, with swing applied."""
+        pair, step = divmod(tick, 2 * TICKS_PER_16TH)
+        first = 2 * TICKS_PER_16TH * self.swing / 100
+        if step < TICKS_PER_16TH:
+            offset = step * first / TICKS_PER_16TH
+        else:
+            offset = first + (step - TICKS_PER_16TH) * (2 * TICKS_PER_16TH - first) / TICKS_PER_16TH
+        return pair * 2 * TICKS_PER_16TH + offset
+
+    def deadline(self, tick):
+        """Return the perf_counter_ns time tick `tick` is due."""
+        return self.anchor_ns + round((self.position(tick) - self.position(self.anchor_tick))
+                                      * self.period_ns)
+
+    def anchor(self, tick, ns=None):
+        """Re-anchor at `tick`, keeping its current deadline unless `ns` is given."""
+        self.anchor_ns = self.deadline(tick) if ns is None else ns
+        self.anchor_tick = tick
+
+    def change(self, tick, bpm=None, swing=None):
+        """Change tempo and/or swing from `tick` on; earlier ticks keep their times."""
+        self.anchor(tick)
+        if bpm is not None:
+            self.bpm = bpm
+        if swing is not None:
+            self.swing = swing
+
+
+class JitterStats:
+    """Lateness of each tick against its deadline, in nanoseconds.
+
+    Totals cover the whole run; percentiles come from a bounded sample of
+    the ticks since the last report.
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.total = 0
+        self.max = 0
+        self.resyncs = 0
+        self.recent = tracing.Reservoir()
+        self.previous = None
+        self.intervals = tracing.Reservoir()
+
+    def add(self, lateness):
+        self.ticks += 1
+        self.total += lateness
+        if lateness > self.max:
+            self.max = lateness
+        self.recent.add(lateness)
+        # Change in lateness between ticks = error in the interval the receiver sees
+        if self.previous is not None:
+            self.intervals.add(abs(lateness - self.previous))
+        self.previous = lateness
+
+    def report(self, stream=None):
+        """Print lateness and interval error since the last report, and reset them."""
+        late_max, interval_max = self.recent.max, self.intervals.max
+        recent, intervals = self.recent.take(), self.intervals.take()
+        if not recent:
+            return
+        p50, p99 = tracing.percentile(recent, 0.50), tracing.percentile(recent, 0.99)
+        line = (f"ticks {self.ticks:8d}  late us p50 {p50 / 1000:7.1f} "
+                f"p99 {p99 / 1000:7.1f} max {late_max / 1000:7.1f}")
+        if intervals:
+            line += (f"  interval error us p99 {tracing.percentile(intervals, 0.99) / 1000:7.1f} "
+                     f"max {interval_max / 1000:7.1f}")
+        if self.resyncs:
+            line += f"  resyncs {self.resyncs}"
+        print(line, file=stream or sys.stderr, flush=True)
+
+    def summary(self, stream=None):
+        if not self.ticks:
+            return
+        print(f"{self.ticks} ticks, mean lateness {self.total / self.ticks / 1000:.1f} us, "
+              f"max {self.max / 1000:.1f} us, {self.resyncs} resyncs",
+              file=stream or sys.stderr, flush=True)
+
+
+class MidiClock:
+    """Sends clock on a background thread.
+
+    `send` is called with 'clock', 'start', 'stop' or 'continue'. Controls
+    are thread-safe and take effect at the next tick.
+    """
+
+    def __init__(self, send, bpm=120.0, swing=50.0, spin_ns=SPIN_NS,
+                 report_interval=None, tracer=None):
+        self.send = send
+        self.spin_ns = spin_ns
+        self.report_interval = report_interval
+        self.tracer = tracer or tracing.NULL_TRACER
+        self.schedule = ClockSchedule(check_bpm(bpm), check_swing(swing))
+        self.stats = JitterStats()
+        self.tick = 0
+        self.running = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._quit = False
+        self._thread = None
+
+    def _wait_until(self, deadline):
+        """Sleep until spin_ns before `deadline`, then spin; returns False if woken early."""
+        remaining = deadline - time.perf_counter_ns()
+        if remaining > self.spin_ns:
+            self._wake.wait((remaining - self.spin_ns) / 1e9)
+            if self._wake.is_set():
+                return False
+        while time.perf_counter_ns() < deadline:
+            pass
+        return True
+
+    def _run(self):
+        next_report = (time.perf_counter_ns() + int(self.report_interval * 1e9)
+                       if self.report_interval else None)
+        while True:
+            with self._lock:
+                if self._quit:
+                    return
+                running = self.running
+                deadline = self.schedule.deadline(self.tick) if running else None
+            if not running:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            if not self._wait_until(deadline):
+                self._wake.clear()
+                continue
+
+            with self._lock:
+                if not self.running or self.schedule.deadline(self.tick) != deadline:
+                    continue
+                now = time.perf_counter_ns()
+                self.send('clock')
+                lateness = now - deadline
+                self.stats.add(lateness)
+                self.tracer.latency('tick lateness', deadline)
+                self.tick += 1
+                if lateness > MAX_LATENESS_TICKS * self.schedule.period_ns:
+                    self.schedule.anchor(self.tick, now + round(self.schedule.period_ns))
+                    self.stats.resyncs += 1
+                    self.tracer.count('resyncs')
+                # Reporting right after a tick leaves the whole period before the next
+                if next_report is not None and now >= next_report:
+                    next_report = now + int(self.report_interval * 1e9)
+                    self.stats.report()
+
+    def open(self):
+        """Start the sender thread (stopped until start() or continue_())."""
+        self._thread = threading.Thread(target=self._run, name='mpk-clock', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        with self._lock:
+            self._quit = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _play(self, message, tick):
+        with self._lock:
+            self.send(message)
+            self.tick = tick
+            self.stats.previous = None
+            self.schedule.anchor(tick, time.perf_counter_ns())
+            self.running = True
+        self._wake.set()
+
+    def start(self):
+        """Send Start and clock from the beginning of the song."""
+        self._play('start', 0)
+
+    def continue_(self):
+        """Send Continue and resume clock from the tick where it stopped."""
+        self._play('continue', self.tick)
+
+    def stop(self):
+        with self._lock:
+            if self.running:
+                self.running = False
+                self.send('stop')
+        self._wake.set()
+
+    def _change(self, **kwargs):
+        with self._lock:
+            # Anchor at the last tick sent so the very next interval uses the new values
+            self.schedule.change(max(self.tick - 1, 0), **kwargs)
+        self._wake.set()
+
+    def set_tempo(self, bpm):
+        self._change(bpm=check_bpm(bpm))
+
+    def set_swing(self, swing):
+        self._change(swing=check_swing(swing))
+
+    def report(self, stream=None):
+        with self._lock:
+            self.stats.report(stream)
+
+
+def check_bpm(bpm):
+    if not MIN_BPM <= bpm <= MAX_BPM:
+        raise ValueError(f"tempo must be {MIN_BPM:g}-{MAX_BPM:g} BPM")
+    return float(bpm)
+
+
+def check_swing(swing):
+    if not MIN_SWING <= swing <= MAX_SWING:
+        raise ValueError(f"swing must be {MIN_SWING:g}-{MAX_SWING:g}%")
+    return float(swing)
+
+
+def port_sender(port):
+    """Return a send(kind) function that reuses one mido message per kind."""
+    mido = _mido()
+    messages = {kind: mido.Message(kind) for kind in ('clock', 'start', 'stop', 'continue')}
+
+    def send(kind):
+        port.send(messages[kind])
+    return send
+
+
+def open_port(args):
+    """Open the output port chosen by --virtual, --port or --unit (default: MIDI Port)."""
+    mido = _mido()
+    if args.virtual:
+        return mido.open_output(args.virtual, virtual=True)
+    if args.port:
+        return mido.open_output(args.port)
+
+    from port_registry import get_registry
+
+    unit = get_registry().unit(index=args.unit)
+    if not unit or not unit.output('midi'):
+        sys.exit("ERROR: MPK mini IV MIDI Port not found (use --port or --virtual)")
+    return unit.open_output('midi')
+
+
+CONTROLS = """Commands (type and press Enter):
+  <bpm>       set tempo, e.g. 128 or 97.5
+  s <percent> set swing, 50 (straight) to 75
+  start       Start from the beginning
+  stop        Stop
+  cont        Continue from where it stopped
+  r           print a jitter report
+  q           quit"""
+
+
+def control_loop(clock, stream=sys.stdin):
+    """Read tempo/swing/transport commands from `stream` until q or EOF."""
+    for line in stream:
+        words = line.split()
+        if not words:
+            continue
+        command = words[0].lower()
+        try:
+            if command in ('q', 'quit'):
+                return
+            elif command == 'start':
+                clock.start()
+            elif command == 'stop':
+                clock.stop()
+            elif command in ('cont', 'continue'):
+                clock.continue_()
+            elif command == 'r':
+                clock.report(sys.stdout)
+            elif command == 's' and len(words) == 2:
+                clock.set_swing(float(words[1]))
+            else:
+                clock.set_tempo(float(command))
+            print(f"{command}: ok")
+        except ValueError as e:
+            print(f"{line.strip()!r}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Send MIDI clock to the MPK Mini IV or a virtual port')
+    parser.add_argument('--bpm', '-b', type=float, default=120.0, help='Tempo (default: 120)')
+    parser.add_argument('--swing', type=float, default=50.0,
+                        help='16th-note swing percent, 50 (straight) to 75')
+    parser.add_argument('--port', '-p', help='Output port name (default: the MIDI Port)')
+    parser.add_argument('--unit', '-u', type=int, help='Controller to use when several are attached')
+    parser.add_argument('--virtual', '-v', metavar='NAME',
+                        help='Create a virtual output port instead (macOS/Linux)')
+    parser.add_argument('--no-output', action='store_true',
+                        help='Run the scheduler without a port, to measure jitter on this machine')
+    parser.add_argument('--duration', '-d', type=float,
+                        help='Send Stop and exit after SECONDS (default: read commands from stdin)')
+    parser.add_argument('--report', type=float, default=5.0, metavar='SECONDS',
+                        help='Print a jitter report every SECONDS (0 to disable)')
+    parser.add_argument('--spin-us', type=float, default=SPIN_NS / 1000,
+                        help='Spin instead of sleeping this long before each tick')
+    tracing.add_arguments(parser)
+    args = parser.parse_args(argv)
+    tracer = tracing.from_args(args)
+
+    try:
+        check_bpm(args.bpm)
+        check_swing(args.swing)
+    except ValueError as e:
+        parser.error(str(e))
+
+    port = None
+    if args.no_output:
+        send = lambda kind: None  # noqa: E731
+        target = 'no output'
+    else:
+        port = open_port(args)
+        send = port_sender(port)
+        target = port.name
+
+    clock = MidiClock(send, bpm=args.bpm, swing=args.swing, spin_ns=int(args.spin_us * 1000),
+                      report_interval=args.report or None, tracer=tracer)
+    clock.open()
+    print(f"Clock {args.bpm:g} BPM, swing {args.swing:g}% -> {target}", file=sys.stderr)
+    try:
+        clock.start()
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            print(CONTROLS)
+            control_loop(clock)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        clock.stop()
+        clock.close()
+        if port:
+            port.close()
+        clock.report()
+        clock.stats.summary()
+        tracing.finish(tracer, args)
+
+
+if __name__ == '__main__':
+    main()
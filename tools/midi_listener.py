@@ -5,23 +5,35 @@ Interactive tool for capturing and analyzing MIDI messages from the controller.
 Outputs structured data that can be used to verify/create Remote codec mappings.
 """
 
-import mido
 import json
+import queue
 import sys
 import argparse
+import time
 from datetime import datetime
 from collections import defaultdict
 
+import tracing
+
+# Messages buffered between the MIDI backend thread and the listener when tracing
+QUEUE_SIZE = 4096
+
+# Seconds the traced listener waits for a message before checking --duration
+QUEUE_POLL = 0.1
+
 class MIDIListener:
-    def __init__(self, port_name=None, output_format='human'):
+    def __init__(self, port_name=None, output_format='human', tracer=None):
         self.port_name = port_name
         self.output_format = output_format
         self.captured_messages = []
         self.message_summary = defaultdict(list)
+        self.tracer = tracer or tracing.NULL_TRACER
 
     def find_mpk_ports(self):
         """Find all MPK Mini IV MIDI ports"""
-        all_ports = mido.get_input_names()
+        from port_registry import get_registry
+
+        all_ports = get_registry().input_names()
         mpk_ports = [p for p in all_ports if 'MPK mini IV' in p]
         return mpk_ports, all_ports
 
@@ -77,30 +89,96 @@ class MIDIListener:
                 'description': str(msg)
             }
 
+    def render_message(self, formatted):
+        """Return the output line for a formatted message"""
+        if self.output_format == 'json':
+            return json.dumps(formatted)
+        desc = formatted['description']
+        hex_str = formatted['hex']
+        pattern = formatted.get('reason_pattern', 'N/A')
+        return f"{desc:50s} | {hex_str:15s} | Pattern: {pattern}"
+
     def print_message(self, formatted):
         """Print a formatted message"""
-        if self.output_format == 'json':
-            print(json.dumps(formatted))
-        else:
-            desc = formatted['description']
-            hex_str = formatted['hex']
-            pattern = formatted.get('reason_pattern', 'N/A')
-            print(f"{desc:50s} | {hex_str:15s} | Pattern: {pattern}")
+        print(self.render_message(formatted))
+
+    def process_message(self, msg, elapsed, port, received=None):
+        """Format, record and print one message, timing each stage when tracing.
+
+        received is the perf_counter_ns time the backend delivered the message.
+        """
+        trace = self.tracer
+        if received is not None:
+            trace.latency('backend -> process', received)
+        with trace.span('format_message'):
+            formatted = self.format_message(msg)
+        formatted['time'] = elapsed
+        formatted['port'] = port
+        self.captured_messages.append(formatted)
+        with trace.span('serialize'):
+            line = self.render_message(formatted)
+        with trace.span('output'):
+            print(line)
+
+        # Track for summary
+        key = (formatted['type'], formatted.get('channel'), formatted.get('cc'), formatted.get('note'))
+        self.message_summary[key].append(formatted)
+        trace.maybe_report()
+        return formatted
+
+    def _traced_messages(self, mido, port):
+        """Open port with a backend callback that stamps each message on arrival.
+
+        Yields (received, msg) from a bounded queue, counting queue depth and
+        the messages dropped when the queue is full. Yields (None, None) when
+        the port is idle for QUEUE_POLL seconds, so callers can check their
+        duration; the timed wait also keeps Ctrl+C working on Windows.
+        """
+        trace = self.tracer
+        pending = queue.Queue(maxsize=QUEUE_SIZE)
+
+        def on_message(msg):
+            try:
+                pending.put_nowait((time.perf_counter_ns(), msg))
+            except queue.Full:
+                trace.count('dropped')
+
+        with mido.open_input(port, callback=on_message):
+            while True:
+                try:
+                    received, msg = pending.get(timeout=QUEUE_POLL)
+                except queue.Empty:
+                    yield None, None
+                    continue
+                trace.gauge('queue depth', pending.qsize())
+                yield received, msg
+
+    def _messages(self, mido, port):
+        """Yield (received, msg); received is None when tracing is off."""
+        if self.tracer.enabled:
+            yield from self._traced_messages(mido, port)
+            return
+        with mido.open_input(port) as inport:
+            for msg in inport:
+                yield None, msg
 
-    def list_ports(self):
+    def list_ports(self, stream=None):
         """List all available MIDI ports"""
-        all_ports = mido.get_input_names()
-        print("Available MIDI input ports:")
-        print("-" * 40)
+        from port_registry import get_registry
+
+        stream = stream or sys.stdout
+        all_ports = get_registry().input_names()
+        print("Available MIDI input ports:", file=stream)
+        print("-" * 40, file=stream)
         for i, port in enumerate(all_ports, 1):
-            print(f"  {i}. {port}")
+            print(f"  {i}. {port}", file=stream)
         if not all_ports:
-            print("  (no ports found)")
+            print("  (no ports found)", file=stream)
         return all_ports
 
-    def select_port_interactive(self, all_ports):
+    def select_port_interactive(self, all_ports, stream=None):
         """Prompt user to select a port interactively"""
-        print("\nEnter port number (or 'q' to quit): ", end='', flush=True)
+        print("\nEnter port number (or 'q' to quit): ", end='', flush=True, file=stream or sys.stdout)
         try:
             choice = input().strip()
             if choice.lower() == 'q':
@@ -117,6 +195,8 @@ class MIDIListener:
 
     def listen(self, duration=None, max_messages=None, interactive=True):
         """Listen for MIDI messages"""
+        import mido
+
         mpk_ports, all_ports = self.find_mpk_ports()
 
         # Select port
@@ -127,11 +207,12 @@ class MIDIListener:
                 print(f"Available ports: {all_ports}", file=sys.stderr)
                 return False
         elif interactive and sys.stdin.isatty():
-            # Interactive port selection
-            all_ports = self.list_ports()
+            # Interactive port selection; keep JSON output on stdout clean for redirection
+            stream = sys.stderr if self.output_format == 'json' else sys.stdout
+            all_ports = self.list_ports(stream)
             if not all_ports:
                 return False
-            port = self.select_port_interactive(all_ports)
+            port = self.select_port_interactive(all_ports, stream)
             if not port:
                 return False
         else:
@@ -155,28 +236,27 @@ class MIDIListener:
             print("-" * 90)
 
         count = 0
+        messages = self._messages(mido, port)
         try:
-            with mido.open_input(port) as inport:
-                start_time = datetime.now()
-                for msg in inport:
-                    formatted = self.format_message(msg)
-                    self.captured_messages.append(formatted)
-                    self.print_message(formatted)
-
-                    # Track for summary
-                    key = (formatted['type'], formatted.get('channel'), formatted.get('cc'), formatted.get('note'))
-                    self.message_summary[key].append(formatted)
-
-                    count += 1
-                    if max_messages and count >= max_messages:
+            start_time = datetime.now()
+            for received, msg in messages:
+                elapsed = (datetime.now() - start_time).total_seconds()
+                if msg is None:
+                    if duration and elapsed >= duration:
                         break
-                    if duration:
-                        elapsed = (datetime.now() - start_time).total_seconds()
-                        if elapsed >= duration:
-                            break
+                    continue
+                self.process_message(msg, elapsed, port, received)
+
+                count += 1
+                if max_messages and count >= max_messages:
+                    break
+                if duration and elapsed >= duration:
+                    break
 
         except KeyboardInterrupt:
             pass
+        finally:
+            messages.close()
 
         self.print_summary()
         return True
@@ -250,7 +330,7 @@ class MIDIListener:
                 print(f'{{ pattern="{pattern}", name="TODO" }},', file=sys.stderr)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='MPK Mini IV MIDI Listener')
     parser.add_argument('--port', '-p', help='Specific port name to use')
     parser.add_argument('--list', '-l', action='store_true', help='List available MIDI ports and exit')
@@ -258,16 +338,28 @@ def main():
                         help='Output format')
     parser.add_argument('--duration', '-d', type=float, help='Listen duration in seconds')
     parser.add_argument('--max', '-m', type=int, help='Maximum messages to capture')
+    parser.add_argument('--save', '-s',
+                        help='Save the capture as NumPy columns (.npz, or a directory of .npy files)')
+    tracing.add_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-    listener = MIDIListener(port_name=args.port, output_format=args.format)
+    tracer = tracing.from_args(args)
+    listener = MIDIListener(port_name=args.port, output_format=args.format, tracer=tracer)
 
     if args.list:
         listener.list_ports()
         return
 
     listener.listen(duration=args.duration, max_messages=args.max)
+    tracing.finish(tracer, args)
+
+    if args.save and listener.captured_messages:
+        import captures
+
+        columns, port_names = captures.columns_from_records(listener.captured_messages)
+        captures.save(columns, port_names, args.save)
+        print(f"Saved {len(listener.captured_messages)} messages to {args.save}", file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+MPK Mini IV command line.
+One entry point for the tools in this directory:
+
+    python tools/mpk.py <command> [options]
+    python tools/mpk.py <command> --help
+
+Commands import their tool module only when run, and only the commands
+that open ports import mido / rtmidi, so offline commands (decode,
+generate, validate-map) start without loading a MIDI backend.
+"""
+
+import importlib
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# command: (module, function, help)
+COMMANDS = {
+    'listen': ('midi_listener', 'main', 'Monitor MIDI input from the controller'),
+    'read': ('read_preset_clock', 'main', 'Read a preset from the controller'),
+    'write': ('write_preset', 'main', 'Write a preset to the controller'),
+    'decode': ('decode_preset', 'main', 'Decode presets_raw.json'),
+    'store': ('preset_store', 'main', 'Store, deduplicate and diff preset snapshots'),
+    'generate': ('generate_codec', 'main', 'Generate the Lua codec from codec_spec.py'),
+    'simulate': ('codec_sim', 'main', 'Run the Lua codec against a stubbed Remote API'),
+    'presets': ('batch_presets', 'main', 'Generate a preset per remotemap device scope'),
+    'pages': ('build_pages', 'main', 'Build knob pages for large devices'),
+    'clock': ('midi_clock', 'main', 'Send MIDI clock (Start/Stop/Continue) to a port'),
+    'discover': ('poll_mk4', 'main', 'Probe the controller SysEx protocol'),
+    'ports': ('port_registry', 'main', 'List attached units and their ports'),
+    'export': ('captures', 'export_main', 'Export a JSON capture to NumPy columns'),
+    'analyze': ('captures', 'analyze_main', 'Analyze an exported capture'),
+    'validate-map': ('remote_files', 'validate_main', 'Check the remotemap against the codec'),
+}
+
+
+def usage():
+    lines = ["usage: mpk.py <command> [options]", "", "commands:"]
+    for name, (_, _, help_text) in COMMANDS.items():
+        lines.append(f"  {name:<14s} {help_text}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"mpk.py: unknown command '{command}'\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+
+    module_name, function_name, _ = COMMANDS[command]
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    module = importlib.import_module(module_name)
+
+    # Each tool parses its own options, so help and errors name the command
+    sys.argv[0] = f"mpk.py {command}"
+    getattr(module, function_name)(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,7 @@ MPK Mini MK4 MIDI Discovery Script
 Polls the device to discover its SysEx protocol and MIDI capabilities.
 """
 
-import mido
+import argparse
 import time
 from collections import defaultdict
 
@@ -14,6 +14,8 @@ def hex_str(data):
 
 def send_and_receive(outport, inport, sysex_data, description, timeout=0.5):
     """Send a SysEx message and capture any response."""
+    import mido
+
     print(f"\n>>> Sending: {description}")
     print(f"    TX: F0 {hex_str(sysex_data)} F7")
 
@@ -43,14 +45,24 @@ def send_and_receive(outport, inport, sysex_data, description, timeout=0.5):
 
     return responses
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MPK Mini MK4 MIDI Discovery')
+    parser.add_argument('--monitor', '-m', type=float, default=15,
+                        help='Seconds to monitor the MIDI Port after the SysEx probes')
+    args = parser.parse_args(argv)
+
+    import mido
+    from port_registry import get_registry
+
+    registry = get_registry()
+
     print("=" * 70)
     print("MPK Mini MK4 MIDI Discovery")
     print("=" * 70)
 
     # List all ports
-    in_ports = mido.get_input_names()
-    out_ports = mido.get_output_names()
+    in_ports = registry.input_names()
+    out_ports = registry.output_names()
 
     mpk_in_ports = [p for p in in_ports if 'MPK mini IV' in p]
     mpk_out_ports = [p for p in out_ports if 'MPK mini IV' in p]
@@ -144,7 +156,7 @@ def main():
     # 4. Monitor MIDI Port for real-time data
     print("\n" + "=" * 70)
     print("Monitoring MIDI Port - INTERACT WITH DEVICE NOW!")
-    print("(Press pads, turn knobs, play keys for 15 seconds)")
+    print(f"(Press pads, turn knobs, play keys for {args.monitor:g} seconds)")
     print("=" * 70)
 
     midi_port_in = next((p for p in mpk_in_ports if 'MIDI Port' in p and 'DAW' not in p), None)
@@ -153,7 +165,7 @@ def main():
             messages = defaultdict(list)
             start = time.time()
 
-            while time.time() - start < 15:
+            while time.time() - start < args.monitor:
                 msg = inport.poll()
                 if msg:
                     print(f"  {msg}")
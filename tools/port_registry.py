@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+MPK Mini IV port registry.
+Enumerates MIDI ports once, caches the names and groups each controller's
+MIDI/DAW/Software/DIN ports into a Unit handle. A background watcher can
+re-enumerate on an interval and notify subscribers when ports come or go.
+"""
+
+import argparse
+import re
+import sys
+import threading
+import time
+
+DEVICE_NAME = 'MPK mini IV'
+
+# role: text that identifies the port in its name
+ROLES = {
+    'midi': 'MIDI Port',
+    'daw': 'DAW Port',
+    'software': 'Software Port',
+    'din': 'Din Port',
+}
+
+IDENTITY_REQUEST = [0x7E, 0x7F, 0x06, 0x01]
+
+
+def port_role(name):
+    """Return the role of an MPK port name, or None."""
+    for role, label in ROLES.items():
+        if label.lower() in name.lower():
+            return role
+    return None
+
+
+def unit_key(name):
+    """Return the part of a port name shared by all ports of one controller.
+
+    macOS:   "MPK mini IV DAW Port"                     -> "MPK mini IV"
+    Windows: "2- MPK mini IV DAW Port 3"                -> "2- MPK mini IV"
+    ALSA:    "MPK mini IV:MPK mini IV DAW Port 24:1"    -> "MPK mini IV:MPK mini IV 24"
+
+    ALSA's client number identifies the controller, so it is kept; the
+    Windows port index differs between a unit's inputs and outputs, so it
+    is dropped.
+    """
+    key = name
+    for label in ROLES.values():
+        key = re.sub(re.escape(label), '', key, flags=re.IGNORECASE)
+    key = key.strip()
+    if re.search(r'\d+:\d+$', key):
+        key = re.sub(r'(\d+):\d+$', r'\1', key)
+    else:
+        key = re.sub(r'\s+\d+$', '', key)
+    return ' '.join(key.split())
+
+
+def unit_order(key):
+    """Sort key putting Windows' "2- " / "3- " duplicates after the first unit."""
+    match = re.match(r'(\d+)- ', key)
+    return (int(match.group(1)) if match else 1, key)
+
+
+class Unit:
+    """One physical controller: its ports by role and, once known, its identity reply."""
+
+    def __init__(self, key):
+        self.key = key
+        self.inputs = {}
+        self.outputs = {}
+        self.identity = None
+
+    def input(self, role):
+        return self.inputs.get(role)
+
+    def output(self, role):
+        return self.outputs.get(role)
+
+    def open_input(self, role, **kwargs):
+        import mido
+
+        name = self.inputs.get(role)
+        if not name:
+            raise IOError(f"{self.key}: no {ROLES[role]} input")
+        return mido.open_input(name, **kwargs)
+
+    def open_output(self, role, **kwargs):
+        import mido
+
+        name = self.outputs.get(role)
+        if not name:
+            raise IOError(f"{self.key}: no {ROLES[role]} output")
+        return mido.open_output(name, **kwargs)
+
+    def __repr__(self):
+        return f"Unit({self.key!r}, inputs={sorted(self.inputs)}, outputs={sorted(self.outputs)})"
+
+
+class PortRegistry:
+    """Cached MIDI port names grouped into MPK Mini IV units."""
+
+    def __init__(self, device_name=DEVICE_NAME):
+        self.device_name = device_name
+        self._lock = threading.Lock()
+        self._inputs = None
+        self._outputs = None
+        self._units = []
+        self._identities = {}
+        self._subscribers = []
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def _enumerate(self):
+        import mido
+
+        return list(mido.get_input_names()), list(mido.get_output_names())
+
+    def _group(self, inputs, outputs):
+        units = {}
+        for names, attr in ((inputs, 'inputs'), (outputs, 'outputs')):
+            for name in names:
+                role = port_role(name)
+                if self.device_name not in name or role is None:
+                    continue
+                key = unit_key(name)
+                unit = units.get(key)
+                if unit is None:
+                    unit = units[key] = Unit(key)
+                    unit.identity = self._identities.get(key)
+                getattr(unit, attr)[role] = name
+        return [units[key] for key in sorted(units, key=unit_order)]
+
+    def refresh(self):
+        """Re-enumerate ports. Returns (added, removed) port names and notifies subscribers."""
+        inputs, outputs = self._enumerate()
+        with self._lock:
+            before = set(self._inputs or ()) | set(self._outputs or ())
+            first = self._inputs is None
+            self._inputs, self._outputs = inputs, outputs
+            self._units = self._group(inputs, outputs)
+            after = set(inputs) | set(outputs)
+            subscribers = list(self._subscribers)
+
+        added, removed = sorted(after - before), sorted(before - after)
+        if not first and (added or removed):
+            for callback in subscribers:
+                callback(self, added, removed)
+        return added, removed
+
+    def _ensure(self):
+        if self._inputs is None:
+            self.refresh()
+
+    def input_names(self):
+        self._ensure()
+        return list(self._inputs)
+
+    def output_names(self):
+        self._ensure()
+        return list(self._outputs)
+
+    def units(self):
+        self._ensure()
+        return list(self._units)
+
+    def unit(self, index=None, key=None, identity=None):
+        """Return one unit by index, key or identity reply prefix.
+
+        Warns when several units are attached and none was chosen.
+        """
+        units = self.units()
+        if key is not None:
+            return next((u for u in units if u.key == key), None)
+        if identity is not None:
+            identity = tuple(identity)
+            return next((u for u in units if u.identity and u.identity[:len(identity)] == identity), None)
+        if index is not None:
+            return units[index] if 0 <= index < len(units) else None
+        if len(units) > 1:
+            print(f"WARNING: {len(units)} {self.device_name} units attached, using {units[0].key!r}"
+                  f" (choose one with --unit)", file=sys.stderr)
+        return units[0] if units else None
+
+    def find_input(self, text):
+        return next((n for n in self.input_names() if text in n), None)
+
+    def find_output(self, text):
+        return next((n for n in self.output_names() if text in n), None)
+
+    def identify(self, unit, timeout=0.5):
+        """Send a Universal Identity Request on the unit's Software Port and cache the reply."""
+        if not unit.input('software') or not unit.output('software'):
+            return None
+
+        import mido
+
+        with unit.open_input('software') as inport, unit.open_output('software') as outport:
+            for _ in inport.iter_pending():
+                pass
+            outport.send(mido.Message('sysex', data=IDENTITY_REQUEST))
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                for msg in inport.iter_pending():
+                    if msg.type == 'sysex' and msg.data[0] == 0x7E and tuple(msg.data[2:4]) == (0x06, 0x02):
+                        unit.identity = tuple(msg.data)
+                        with self._lock:
+                            self._identities[unit.key] = unit.identity
+                        return unit.identity
+                time.sleep(0.005)
+        return None
+
+    def identify_all(self, timeout=0.5):
+        """Identify every unit that has not replied yet; returns the units."""
+        units = self.units()
+        for unit in units:
+            if unit.identity is None:
+                self.identify(unit, timeout)
+        return units
+
+    def subscribe(self, callback):
+        """Call callback(registry, added, removed) whenever a refresh changes the port list."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def start_watching(self, interval=1.0):
+        """Re-enumerate every `interval` seconds on a daemon thread."""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._ensure()
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Port watcher: {e}", file=sys.stderr)
+
+        self._watcher = threading.Thread(target=watch, name='mpk-port-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join()
+            self._watcher = None
+
+
+_registry = None
+
+
+def get_registry():
+    """Return the process-wide registry, so every tool shares one enumeration."""
+    global _registry
+    if _registry is None:
+        _registry = PortRegistry()
+    return _registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List MPK Mini IV units and their ports')
+    parser.add_argument('--identify', '-i', action='store_true',
+                        help='Send an identity request to each unit')
+    parser.add_argument('--watch', '-w', action='store_true', help='Report hotplug changes until Ctrl+C')
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    units = registry.units()
+    if not units:
+        print(f"No {DEVICE_NAME} found")
+    if args.identify:
+        registry.identify_all()
+    for i, unit in enumerate(units):
+        print(f"Unit {i}: {unit.key}")
+        for role, label in ROLES.items():
+            print(f"  {label:<14s} in: {unit.input(role) or '-'}  out: {unit.output(role) or '-'}")
+        if args.identify:
+            identity = unit.identity
+            print(f"  Identity: {' '.join(f'{b:02X}' for b in identity) if identity else '(no reply)'}")
+
+    if args.watch:
+        registry.subscribe(lambda reg, added, removed: print(
+            f"Ports changed: +{added} -{removed}; {len(reg.units())} unit(s)"))
+        registry.start_watching()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            registry.stop_watching()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for preset snapshots.
+Each snapshot's payload (the 321-byte preset as read_preset returns it) is
+hashed with SHA-256 and stored once; an index records every snapshot's
+hash, name, slot, time and source. Diffs work per field of the layout in
+decode_preset.py, vectorized with NumPy so one preset can be compared with
+the whole history at once:
+
+    python tools/mpk.py store add presets_raw.json
+    python tools/mpk.py store changed knobs.3.cc
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from decode_preset import decode_preset, field_value, preset_fields
+from generate_reason_preset import PRESET_LENGTH
+from remote_files import REPO_DIR
+
+STORE_DIR = os.path.join(REPO_DIR, 'build', 'preset_store')
+OBJECTS_NAME = 'objects.bin'  # unique payloads, PRESET_LENGTH bytes each
+INDEX_NAME = 'index.jsonl'    # one snapshot per line
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        sys.exit("ERROR: numpy is required for preset diffs (pip install numpy)")
+    return np
+
+
+def payload_hash(payload):
+    return hashlib.sha256(bytes(payload)).hexdigest()
+
+
+def diff_fields():
+    """Return (field, start, end) covering every payload byte.
+
+    Decoded fields come from decode_preset.preset_fields(); bytes between
+    them get "bytes.<start>-<end>" fields so no change goes unreported.
+    """
+    fields, position = [], 0
+    for name, offset, size in preset_fields():
+        if offset > position:
+            fields.append((f"bytes.{position}-{offset - 1}", position, offset))
+        fields.append((name, offset, offset + size))
+        position = offset + size
+    if position < PRESET_LENGTH:
+        fields.append((f"bytes.{position}-{PRESET_LENGTH - 1}", position, PRESET_LENGTH))
+    return fields
+
+
+def read_payloads(path):
+    """Return [(payload, label)] from a .syx file, a read --json list or a presets_raw.json dict."""
+    if path.endswith('.syx'):
+        with open(path, 'rb') as f:
+            data = list(f.read())
+        messages, start = [], None
+        for i, b in enumerate(data):
+            if b == 0xF0:
+                start = i
+            elif b == 0xF7 and start is not None:
+                messages.append((data[start + 1:i], os.path.basename(path)))
+                start = None
+        return messages
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return [(payload, f"{os.path.basename(path)}:{key}") for key, payload in data.items()]
+    return [(data, os.path.basename(path))]
+
+
+class PresetStore:
+    """Snapshots on disk plus an in-memory hash -> row map for deduplication."""
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        self.snapshots = []
+        self.rows = {}
+        self._matrix = None
+        index_path = os.path.join(path, INDEX_NAME)
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                self.snapshots = [json.loads(line) for line in f if line.strip()]
+        for snapshot in self.snapshots:
+            self.rows[snapshot['hash']] = snapshot['row']
+
+    def add(self, payload, source='', time=None, name=None):
+        """Add a snapshot; returns (snapshot, True if the payload was new)."""
+        payload = list(payload)
+        if len(payload) != PRESET_LENGTH or payload[3] != 0x67:
+            raise ValueError(f"not a {PRESET_LENGTH}-byte preset payload")
+        if any(not 0 <= b <= 0x7F for b in payload):
+            raise ValueError("data byte outside 0-127")
+
+        digest = payload_hash(payload)
+        new = digest not in self.rows
+        os.makedirs(self.path, exist_ok=True)
+        if new:
+            with open(os.path.join(self.path, OBJECTS_NAME), 'ab') as f:
+                self.rows[digest] = f.tell() // PRESET_LENGTH
+                f.write(bytes(payload))
+            self._matrix = None
+
+        snapshot = {
+            'id': len(self.snapshots),
+            'hash': digest,
+            'row': self.rows[digest],
+            'name': name or decode_preset(payload)['name'],
+            'slot': payload[6],
+            'time': time or datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'source': source,
+        }
+        with open(os.path.join(self.path, INDEX_NAME), 'a') as f:
+            f.write(json.dumps(snapshot) + '\n')
+        self.snapshots.append(snapshot)
+        return snapshot, new
+
+    def matrix(self):
+        """Return the unique payloads as a (rows, PRESET_LENGTH) uint8 array (memory-mapped)."""
+        if self._matrix is None:
+            np = _numpy()
+            path = os.path.join(self.path, OBJECTS_NAME)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                self._matrix = np.zeros((0, PRESET_LENGTH), dtype=np.uint8)
+            else:
+                self._matrix = np.memmap(path, dtype=np.uint8, mode='r').reshape(-1, PRESET_LENGTH)
+        return self._matrix
+
+    def payload(self, snapshot):
+        return [int(b) for b in self.matrix()[snapshot['row']]]
+
+    def value(self, snapshot, field):
+        """Return a field's decoded value, or the raw bytes for "bytes.*" fields."""
+        payload = self.payload(snapshot)
+        if field.startswith('bytes.'):
+            start, end = (int(n) for n in field[len('bytes.'):].split('-'))
+            return payload[start:end + 1]
+        return field_value(decode_preset(payload), field)
+
+    def find(self, ref):
+        """Return the snapshot for "#<id>" or a hash prefix (the latest snapshot with that hash)."""
+        if ref.startswith('#'):
+            if ref[1:].isdigit() and int(ref[1:]) < len(self.snapshots):
+                return self.snapshots[int(ref[1:])]
+            raise KeyError(f"no snapshot {ref!r}")
+        matches = [s for s in self.snapshots if s['hash'].startswith(ref.lower())]
+        if not matches:
+            raise KeyError(f"no snapshot with hash {ref!r} (use #<id> for snapshot ids)")
+        if len({s['hash'] for s in matches}) > 1:
+            raise KeyError(f"hash prefix {ref!r} is ambiguous")
+        return matches[-1]
+
+    def diff(self, a, b):
+        """Return [(field, a value, b value)] for fields that differ between two snapshots."""
+        if a['hash'] == b['hash']:
+            return []
+        pa, pb = self.payload(a), self.payload(b)
+        return [(field, self.value(a, field), self.value(b, field))
+                for field, start, end in diff_fields() if pa[start:end] != pb[start:end]]
+
+    def changed_fields(self, rows, other_rows):
+        """Return a (len(rows), fields) bool array of fields that differ between row pairs."""
+        np = _numpy()
+        fields = diff_fields()
+        matrix = self.matrix()
+        changed = matrix[np.asarray(rows)] != matrix[np.asarray(other_rows)]
+        starts = np.array([start for _, start, _ in fields])
+        if not len(changed):
+            return np.zeros((0, len(fields)), dtype=bool)
+        return np.logical_or.reduceat(changed, starts, axis=1)
+
+    def compare(self, snapshot, others=None):
+        """Compare one snapshot with many (default: all); returns {field: number that differ}."""
+        np = _numpy()
+        others = self.snapshots if others is None else others
+        if not others:
+            return {}
+        # Compare unique payloads once, then weight by how many snapshots use each
+        rows, counts = np.unique([s['row'] for s in others], return_counts=True)
+        changed = self.changed_fields(np.full(len(rows), snapshot['row']), rows)
+        totals = (changed * counts[:, None]).sum(axis=0)
+        return {field: int(total) for (field, _, _), total in zip(diff_fields(), totals) if total}
+
+    def history(self):
+        """Pair each snapshot with the previous one in its slot; returns (current, previous)."""
+        last = {}
+        current, previous = [], []
+        for snapshot in sorted(self.snapshots, key=lambda s: (s['time'], s['id'])):
+            before = last.get(snapshot['slot'])
+            if before is not None:
+                current.append(snapshot)
+                previous.append(before)
+            last[snapshot['slot']] = snapshot
+        return current, previous
+
+    def changed(self, field):
+        """Return [(snapshot, previous)] for snapshots where `field` changed within their slot."""
+        np = _numpy()
+        spans = {name: (start, end) for name, start, end in diff_fields()}
+        if field not in spans:
+            raise KeyError(f"unknown field {field!r}")
+        start, end = spans[field]
+        current, previous = self.history()
+        if not current:
+            return []
+        matrix = self.matrix()
+        a = matrix[np.array([s['row'] for s in current]), start:end]
+        b = matrix[np.array([s['row'] for s in previous]), start:end]
+        hits = np.flatnonzero((a != b).any(axis=1))
+        return [(current[i], previous[i]) for i in hits]
+
+
+def describe(snapshot):
+    return (f"#{snapshot['id']:<5d} {snapshot['hash'][:12]}  slot {snapshot['slot']}  "
+            f"{snapshot['time']}  {snapshot['name']!r}  {snapshot['source']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Content-addressed MPK Mini IV preset snapshots')
+    parser.add_argument('--store', default=STORE_DIR, help='Store directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='Add presets from .syx or JSON files')
+    add.add_argument('files', nargs='+')
+    add.add_argument('--time', help='Snapshot time (ISO 8601, default: now)')
+
+    commands.add_parser('list', help='List snapshots')
+
+    diff = commands.add_parser('diff', help='Field-level diff of two snapshots (#id or hash prefix)')
+    diff.add_argument('a')
+    diff.add_argument('b')
+
+    compare = commands.add_parser('compare', help='Count how many snapshots differ from one, per field')
+    compare.add_argument('snapshot', help='#id or hash prefix')
+
+    changed = commands.add_parser('changed', help='Snapshots where a field changed since the previous '
+                                                  'snapshot of the same slot')
+    changed.add_argument('field', help='e.g. knobs.3.cc, pads.1.note, global.arp_tempo')
+
+    commands.add_parser('fields', help='List field names')
+    args = parser.parse_args(argv)
+
+    store = PresetStore(args.store)
+
+    def find(ref):
+        try:
+            return store.find(ref)
+        except KeyError as e:
+            parser.error(e.args[0])
+
+    if args.command == 'add':
+        added = new = 0
+        for path in args.files:
+            for payload, source in read_payloads(path):
+                _, is_new = store.add(payload, source=source, time=args.time)
+                added += 1
+                new += is_new
+        print(f"Added {added} snapshots ({new} new payloads, {added - new} duplicates) to {args.store}")
+    elif args.command == 'list':
+        for snapshot in store.snapshots:
+            print(describe(snapshot))
+        print(f"{len(store.snapshots)} snapshots, {len(store.rows)} unique payloads", file=sys.stderr)
+    elif args.command == 'diff':
+        for field, a, b in store.diff(find(args.a), find(args.b)):
+            print(f"  {field:<24s} {a!r} -> {b!r}")
+    elif args.command == 'compare':
+        snapshot = find(args.snapshot)
+        counts = store.compare(snapshot)
+        print(describe(snapshot))
+        for field, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"  {field:<24s} differs in {count} of {len(store.snapshots)}")
+    elif args.command == 'changed':
+        for snapshot, before in store.changed(args.field):
+            old, new = store.value(before, args.field), store.value(snapshot, args.field)
+            print(f"{describe(snapshot)}  {old!r} -> {new!r}")
+    elif args.command == 'fields':
+        for field, start, end in diff_fields():
+            print(f"  {field:<24s} bytes {start}-{end - 1}")
+
+
+if __name__ == '__main__':
+    main()
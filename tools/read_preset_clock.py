@@ -3,54 +3,66 @@
 Read preset 2 from MPK Mini IV and check the arp_clock setting.
 """
 
-import mido
+import argparse
+import contextlib
+import json
+import sys
 import time
 
-def read_preset(preset_num=2):
-    # Find the Software Port
-    in_port_name = None
-    out_port_name = None
+import tracing
+
+def read_preset(preset_num=2, verbose=True, unit=None, tracer=None):
+    import mido
+    from port_registry import get_registry
 
-    for name in mido.get_output_names():
-        if 'MPK mini' in name and 'Software' in name:
-            out_port_name = name
+    trace = tracer or tracing.NULL_TRACER
 
-    for name in mido.get_input_names():
-        if 'MPK mini' in name and 'Software' in name:
-            in_port_name = name
+    # Find the Software Port
+    unit = unit or get_registry().unit()
+    in_port_name = unit and unit.input('software')
+    out_port_name = unit and unit.output('software')
 
     if not in_port_name or not out_port_name:
-        print("ERROR: MPK mini IV Software Port not found!")
+        print("ERROR: MPK mini IV Software Port not found!", file=sys.stderr)
         return None
 
-    print(f"Reading preset {preset_num} from device...")
-    print(f"  Output: {out_port_name}")
-    print(f"  Input: {in_port_name}")
-    print()
+    if verbose:
+        print(f"Reading preset {preset_num} from device...")
+        print(f"  Output: {out_port_name}")
+        print(f"  Input: {in_port_name}")
+        print()
 
     # Request preset: F0 47 00 5D 66 00 01 [preset_num] F7
     request = [0x47, 0x00, 0x5D, 0x66, 0x00, 0x01, preset_num]
 
     try:
-        with mido.open_input(in_port_name) as inport:
-            with mido.open_output(out_port_name) as outport:
-                # Send request
+        with contextlib.ExitStack() as ports:
+            with trace.span('open ports'):
+                inport = ports.enter_context(mido.open_input(in_port_name))
+                outport = ports.enter_context(mido.open_output(out_port_name))
+            # Send request
+            with trace.span('send request'):
                 msg = mido.Message('sysex', data=request)
                 outport.send(msg)
+            sent = time.perf_counter_ns()
 
-                # Wait for response
-                start = time.time()
+            # Wait for response
+            start = time.time()
+            with trace.span('wait for reply'):
                 while time.time() - start < 3.0:
                     for msg in inport.iter_pending():
+                        trace.count('messages received')
                         if msg.type == 'sysex' and len(msg.data) > 10:
                             if msg.data[3] == 0x67:  # Preset response
+                                trace.latency('request -> reply', sent)
                                 return list(msg.data)
+                    trace.count('polls')
                     time.sleep(0.05)
 
-                print("ERROR: No response from device (timeout)")
-                return None
+            print("ERROR: No response from device (timeout)", file=sys.stderr)
+            return None
     except Exception as e:
-        print(f"ERROR: {e}")
+        print(f"ERROR: {e}", file=sys.stderr)
         return None
 
 def analyze_preset(data):
@@ -84,12 +96,54 @@ def analyze_preset(data):
     for i in range(27, 36):
         print(f"  [{i:2d}] 0x{data[i]:02X} = {data[i]:3d}")
 
-if __name__ == '__main__':
+def save_snapshot(data, store_dir):
+    """Add a read to the preset snapshot store when --store was given."""
+    if store_dir is None:
+        return
+    from preset_store import STORE_DIR, PresetStore
+
+    snapshot, new = PresetStore(store_dir or STORE_DIR).add(data, source='read')
+    print(f"Stored snapshot #{snapshot['id']} ({'new' if new else 'duplicate'} payload"
+          f" {snapshot['hash'][:12]})", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MPK Mini IV Preset Reader')
+    parser.add_argument('--slot', '-s', type=int, default=2, help='Preset slot to read (1-8)')
+    parser.add_argument('--json', '-j', action='store_true',
+                        help='Print the raw preset bytes as JSON instead of the analysis')
+    parser.add_argument('--unit', '-u', type=int, help='Controller to use when several are attached')
+    parser.add_argument('--store', nargs='?', const='', metavar='DIR',
+                        help='Also add the preset to the snapshot store (default: build/preset_store)')
+    tracing.add_arguments(parser)
+    args = parser.parse_args(argv)
+    tracer = tracing.from_args(args)
+
+    unit = None
+    if args.unit is not None:
+        from port_registry import get_registry
+
+        unit = get_registry().unit(index=args.unit)
+        if not unit:
+            parser.error(f"no unit {args.unit}")
+
+    if args.json:
+        data = read_preset(args.slot, verbose=False, unit=unit, tracer=tracer)
+        if data:
+            print(json.dumps(data))
+            save_snapshot(data, args.store)
+        tracing.finish(tracer, args)
+        return
+
     print("=" * 50)
     print("MPK Mini IV Preset Reader")
     print("=" * 50)
     print()
 
-    data = read_preset(2)
+    data = read_preset(args.slot, unit=unit, tracer=tracer)
     if data:
         analyze_preset(data)
+        save_snapshot(data, args.store)
+    tracing.finish(tracer, args)
+
+if __name__ == '__main__':
+    main()
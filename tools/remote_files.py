@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Parsers for Reason Remote text files.
+Reads .remotemap files and the "Remote Info" exports from
+File -> Export Device Remote Info (see device_data/).
+"""
+
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+REMOTEMAP_PATH = os.path.join(REPO_DIR, 'reason_remote', 'MPK_mini_IV.remotemap')
+DEVICE_DATA_DIR = os.path.join(REPO_DIR, 'device_data')
+
+
+def parse_remotemap(text):
+    """Parse remotemap text into a header dict and a list of scopes.
+
+    Map lines are tab separated:
+        Map <control> <key> <remotable> <scale> <mode> <group>
+    """
+    header = {}
+    scopes = []
+    scope = None
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        fields = line.rstrip('\r').split('\t')
+        tag = fields[0]
+        if not tag:
+            continue
+
+        if tag == 'Scope':
+            scope = {
+                'manufacturer': fields[1] if len(fields) > 1 else '',
+                'model': fields[2] if len(fields) > 2 else '',
+                'line': line_number,
+                'groups': [],
+                'maps': [],
+            }
+            scopes.append(scope)
+        elif tag == 'Map':
+            if scope is None:
+                raise ValueError(f"line {line_number}: Map outside of a Scope")
+            fields += [''] * (7 - len(fields))
+            scope['maps'].append({
+                'control': fields[1],
+                'key': fields[2],
+                'remotable': fields[3],
+                'scale': fields[4],
+                'mode': fields[5],
+                'group': fields[6],
+                'line': line_number,
+            })
+        elif tag == 'Define Group':
+            if scope is None:
+                raise ValueError(f"line {line_number}: Define Group outside of a Scope")
+            scope['groups'].append({'name': fields[1], 'variations': [f for f in fields[2:] if f]})
+        elif len(fields) > 1:
+            header[tag] = fields[1]
+        else:
+            header[tag] = ''
+
+    return {'header': header, 'scopes': scopes}
+
+
+def parse_remote_info(text):
+    """Parse an exported Remote Info file into its scope and remotables."""
+    lines = [line.rstrip('\r') for line in text.splitlines()]
+    result = {'manufacturer': '', 'model': '', 'remotables': []}
+    in_remotables = False
+
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+        fields = line.split('\t')
+        if fields[0] == 'Manufacturer' and i + 1 < len(lines):
+            scope = lines[i + 1].split('\t')
+            result['manufacturer'] = scope[0]
+            result['model'] = scope[1] if len(scope) > 1 else ''
+        elif fields[0] == 'Remotable':
+            in_remotables = True
+        elif in_remotables and len(fields) >= 5:
+            result['remotables'].append({
+                'name': fields[0],
+                'min': int(fields[1]),
+                'max': int(fields[2]),
+                'input_type': fields[3],
+                'output_type': fields[4],
+            })
+
+    return result
+
+
+def load_remotemap(path=REMOTEMAP_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_remotemap(f.read())
+
+
+def load_remote_info(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_remote_info(f.read())
+
+
+def remote_info_paths(directory=DEVICE_DATA_DIR):
+    """Return the Remote Info exports in device_data/, sorted by name."""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith('Remote Info.txt'))
+
+
+def validate_remotemap(remotemap, item_names, remote_infos=()):
+    """Return a list of problems found in a parsed remotemap.
+
+    Checks that every Map uses a codec item, that groups are defined, that
+    no control is mapped twice in the same group variation and, for scopes
+    with a Remote Info export, that the remotable exists.
+    """
+    item_names = set(item_names)
+    remotables_by_model = {info['model']: {r['name'] for r in info['remotables']}
+                           for info in remote_infos}
+    problems = []
+
+    for scope in remotemap['scopes']:
+        variations = {v for group in scope['groups'] for v in group['variations']}
+        remotables = remotables_by_model.get(scope['model'])
+        seen = {}
+        for entry in scope['maps']:
+            where = f"line {entry['line']} ({scope['model']})"
+            if entry['control'] not in item_names:
+                problems.append(f"{where}: unknown control '{entry['control']}'")
+            if entry['group'] and entry['group'] not in variations:
+                problems.append(f"{where}: group '{entry['group']}' is not defined")
+            key = (entry['control'], entry['group'])
+            if entry['control'] and key in seen:
+                problems.append(f"{where}: '{entry['control']}' already mapped on line {seen[key]}")
+            seen.setdefault(key, entry['line'])
+            if remotables is not None and entry['remotable'] not in remotables:
+                problems.append(f"{where}: '{entry['remotable']}' is not a remotable of this device")
+
+    return problems
+
+
+def validate_main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate the MPK Mini IV remotemap')
+    parser.add_argument('remotemap', nargs='?', default=REMOTEMAP_PATH, help='Remotemap to check')
+    args = parser.parse_args(argv)
+
+    from generate_codec import codec_item_names
+
+    item_names = codec_item_names()
+    remote_infos = [load_remote_info(path) for path in remote_info_paths()]
+    remotemap = load_remotemap(args.remotemap)
+    problems = validate_remotemap(remotemap, item_names, remote_infos)
+
+    for problem in problems:
+        print(problem)
+    maps = sum(len(scope['maps']) for scope in remotemap['scopes'])
+    print(f"{len(remotemap['scopes'])} scopes, {maps} maps, {len(problems)} problem(s)",
+          file=sys.stderr)
+    if problems:
+        sys.exit(1)
+
+
+def main():
+    remotemap = load_remotemap(sys.argv[1] if len(sys.argv) > 1 else REMOTEMAP_PATH)
+    print(f"{remotemap['header'].get('Control Surface Model', '?')}: "
+          f"{len(remotemap['scopes'])} scopes")
+    for scope in remotemap['scopes']:
+        print(f"  {scope['model']:<60s} {len(scope['maps']):3d} maps")
+
+    print()
+    for path in remote_info_paths():
+        info = load_remote_info(path)
+        print(f"{os.path.basename(path)}: {info['model']} ({len(info['remotables'])} remotables)")
+
+
+if __name__ == '__main__':
+    main()
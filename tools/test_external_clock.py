@@ -4,9 +4,6 @@ Test sending the External Clock preset to MPK Mini IV.
 Run with Reason CLOSED to avoid port conflicts.
 """
 
-import mido
-import time
-
 # The preset SysEx with arp_clock = 1 (External)
 PRESET_SYSEX = bytes([
     0x47, 0x00, 0x5D, 0x67, 0x02, 0x3B,  # Header
@@ -56,18 +53,20 @@ PRESET_SYSEX = bytes([
 ])
 
 def list_ports():
+    from port_registry import get_registry
+
     print("Available MIDI outputs:")
-    for name in mido.get_output_names():
+    for name in get_registry().output_names():
         print(f"  - {name}")
     print()
 
 def send_preset():
+    import mido
+    from port_registry import get_registry
+
     # Find the Software Port
-    port_name = None
-    for name in mido.get_output_names():
-        if 'MPK mini' in name and 'Software' in name:
-            port_name = name
-            break
+    unit = get_registry().unit()
+    port_name = unit and unit.output('software')
 
     if not port_name:
         print("ERROR: MPK mini IV Software Port not found!")
@@ -94,10 +93,13 @@ def send_preset():
         print(f"ERROR sending preset: {e}")
         return False
 
-if __name__ == '__main__':
+def main():
     print("=" * 50)
     print("MPK Mini IV External Clock Test")
     print("=" * 50)
     print()
     list_ports()
     send_preset()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing spans and counters for the MIDI tools.
+A Tracer records a span per processing stage, the delay between the MIDI
+backend receiving a message and the tool processing it, and counters such
+as queue depth and dropped events. Results go to a Chrome trace JSON file
+(chrome://tracing or https://ui.perfetto.dev) and/or a periodic text report.
+
+Tools default to NULL_TRACER, whose methods do nothing, so tracing costs
+one no-op call per stage when it is off.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Trace events kept for the Chrome trace; later events are counted, not
+# stored. That is about 25,000 listener messages and 40 MB; the timing
+# report's counts and percentiles cover the whole session regardless
+MAX_EVENTS = 100_000
+
+# Durations kept per stage between reports for percentiles; beyond this
+# they are reservoir-sampled, so a long session without reports stays bounded
+MAX_RECENT = 10_000
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Tracer stand-in used when tracing is off."""
+
+    enabled = False
+
+    def span(self, name, **args):
+        return _NULL_SPAN
+
+    def latency(self, name, received):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def gauge(self, name, value):
+        pass
+
+    def maybe_report(self):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer._complete(self.name, 'stage', self.start, end - self.start, self.args)
+        return False
+
+
+class Reservoir:
+    """Uniform sample of up to `size` values since the last take(), plus their exact max."""
+
+    __slots__ = ('size', 'values', 'seen', 'max')
+
+    def __init__(self, size=MAX_RECENT):
+        self.size = size
+        self.values = []
+        self.seen = 0
+        self.max = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def add(self, value):
+        self.seen += 1
+        if self.max is None or value > self.max:
+            self.max = value
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            i = random.randrange(self.seen)
+            if i < self.size:
+                self.values[i] = value
+
+    def take(self):
+        """Return the sample, sorted, and start a new one."""
+        values = sorted(self.values)
+        self.values = []
+        self.seen = 0
+        self.max = None
+        return values
+
+
+class _Stat:
+    """Running totals for one span or latency name, plus sampled durations since the last report."""
+
+    __slots__ = ('count', 'total', 'max', 'recent')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.recent = Reservoir()
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.recent.add(duration)
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at `fraction` (0-1) of an already sorted, non-empty list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Tracer:
+    """Collects spans, latencies, counters and gauges.
+
+    Times are perf_counter_ns values; latency() takes the receive time in
+    the same clock so callbacks on backend threads can stamp messages.
+    """
+
+    enabled = True
+
+    def __init__(self, report_interval=None, stream=None, max_events=MAX_EVENTS):
+        self.report_interval = report_interval
+        self.stream = stream or sys.stderr
+        self.max_events = max_events
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self.lost_events = 0
+        self.stats = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._next_report = (self.origin + int(report_interval * 1e9)
+                             if report_interval else None)
+
+    def _tid(self):
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            tid = self._threads[ident] = len(self._threads) + 1
+            self._event({'name': 'thread_name', 'ph': 'M', 'tid': tid,
+                         'args': {'name': threading.current_thread().name}})
+        return tid
+
+    def _event(self, event):
+        if len(self.events) < self.max_events:
+            event['pid'] = os.getpid()
+            self.events.append(event)
+        else:
+            self.lost_events += 1
+
+    def _complete(self, name, category, start, duration, args=None):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = _Stat()
+            stat.add(duration)
+            event = {'name': name, 'cat': category, 'ph': 'X', 'tid': self._tid(),
+                     'ts': (start - self.origin) / 1000, 'dur': duration / 1000}
+            if args:
+                event['args'] = args
+            self._event(event)
+
+    def span(self, name, **args):
+        """Context manager timing one stage."""
+        return _Span(self, name, args)
+
+    def latency(self, name, received):
+        """Record the time from `received` (perf_counter_ns) until now."""
+        now = time.perf_counter_ns()
+        self._complete(name, 'latency', received, now - received)
+
+    def count(self, name, n=1):
+        """Add n to a cumulative counter."""
+        with self._lock:
+            value = self.counters[name] = self.counters.get(name, 0) + n
+            self._event({'name': name, 'ph': 'C', 'tid': 0,
+                         'ts': (time.perf_counter_ns() - self.origin) / 1000,
+                         'args': {name: value}})
+
+    def gauge(self, name, value):
+        """Record the current value of a level, such as a queue depth."""
+        with self._lock:
+            previous = self.gauges.get(name)
+            if previous is not None and previous[0] == value:
+                return
+            self.gauges[name] = (value, max(previous[1], value) if previous else value)
+            self._event({'name': name, 'ph': 'C', 'tid': 0,
+                         'ts': (time.perf_counter_ns() - self.origin) / 1000,
+                         'args': {name: value}})
+
+    def maybe_report(self):
+        """Print a report when the report interval has passed."""
+        if self._next_report is None:
+            return
+        now = time.perf_counter_ns()
+        if now >= self._next_report:
+            self._next_report = now + int(self.report_interval * 1e9)
+            self.report()
+
+    def report(self, stream=None):
+        """Print per-stage timings (percentiles since the last report) and counters."""
+        stream = stream or self.stream
+        with self._lock:
+            elapsed = (time.perf_counter_ns() - self.origin) / 1e9
+            lines = [f"--- trace at {elapsed:.1f}s ---",
+                     f"{'stage':<24s} {'count':>8s} {'mean us':>9s} {'p50 us':>9s} "
+                     f"{'p99 us':>9s} {'max us':>9s}"]
+            for name, stat in self.stats.items():
+                recent = stat.recent.take()
+                p50 = percentile(recent, 0.50) / 1000 if recent else 0.0
+                p99 = percentile(recent, 0.99) / 1000 if recent else 0.0
+                lines.append(f"{name:<24s} {stat.count:8d} {stat.total / stat.count / 1000:9.1f} "
+                             f"{p50:9.1f} {p99:9.1f} {stat.max / 1000:9.1f}")
+            for name, value in self.counters.items():
+                lines.append(f"{name:<24s} {value:8d}")
+            for name, (last, peak) in self.gauges.items():
+                lines.append(f"{name:<24s} {last:8d} (max {peak})")
+            if self.lost_events:
+                lines.append(f"{self.lost_events} trace events over the {self.max_events} limit not kept")
+        print("\n".join(lines), file=stream, flush=True)
+
+    def chrome_trace(self):
+        """Return the trace as a Chrome Trace Event Format dict."""
+        with self._lock:
+            return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def add_arguments(parser):
+    """Add the --trace and --trace-report options to a tool's parser."""
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Record per-stage timings and write a Chrome trace JSON file')
+    parser.add_argument('--trace-report', type=float, metavar='SECONDS',
+                        help='Print a timing report to stderr every SECONDS')
+
+
+def from_args(args):
+    """Return a Tracer if --trace or --trace-report was given, else NULL_TRACER."""
+    if args.trace or args.trace_report:
+        return Tracer(report_interval=args.trace_report)
+    return NULL_TRACER
+
+
+def finish(tracer, args):
+    """Print the final report and write the trace file, if tracing was on."""
+    if not tracer.enabled:
+        return
+    tracer.report()
+    if args.trace:
+        tracer.save(args.trace)
+        print(f"Wrote trace to {args.trace}", file=sys.stderr)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Write a preset to the MPK Mini IV via the Software Port.
+Run with Reason CLOSED to avoid port conflicts.
+"""
+
+import argparse
+import sys
+
+import tracing
+
+SOURCES = ['reason', 'external-clock']
+
+
+def build_preset_data(source='reason', slot=2):
+    """Return SysEx data (without F0/F7) writing `source` to `slot`."""
+    if source == 'reason':
+        from generate_reason_preset import build_reason_preset, encode_sysex, load_presets
+
+        return encode_sysex(build_reason_preset(load_presets()['1'], slot=slot))[1:-1]
+    if source == 'external-clock':
+        from test_external_clock import PRESET_SYSEX
+
+        data = list(PRESET_SYSEX)
+        data[6] = slot
+        return data
+    raise ValueError(f"Unknown preset source: {source}")
+
+
+def read_syx(path, slot=None):
+    """Read a .syx preset file as SysEx data (without F0/F7), optionally retargeting the slot."""
+    from generate_reason_preset import validate_sysex
+
+    with open(path, 'rb') as f:
+        sysex = list(f.read())
+    validate_sysex(sysex)
+    data = sysex[1:-1]
+    if slot is not None:
+        data[6] = slot
+    return data
+
+
+def write_preset(data, port_name=None, unit=None, tracer=None):
+    """Send preset SysEx data to the unit's Software Port (or `port_name`)."""
+    import mido
+    from port_registry import get_registry
+
+    trace = tracer or tracing.NULL_TRACER
+
+    if port_name is None:
+        unit = unit or get_registry().unit()
+        port_name = unit and unit.output('software')
+    if not port_name:
+        print("ERROR: MPK mini IV Software Port not found!", file=sys.stderr)
+        return False
+
+    try:
+        with trace.span('open port'):
+            port = mido.open_output(port_name)
+        with port:
+            with trace.span('send', bytes=len(data) + 2):
+                port.send(mido.Message('sysex', data=data))
+    except Exception as e:
+        print(f"ERROR sending preset: {e}", file=sys.stderr)
+        return False
+
+    print(f"Wrote preset slot {data[6]} ({len(data) + 2} bytes) to {port_name}")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a preset to the MPK Mini IV')
+    parser.add_argument('--slot', '-s', type=int,
+                        help="Preset slot to write, 2-8 (default: 2, or the --file preset's own slot)")
+    parser.add_argument('--source', choices=SOURCES, default='reason',
+                        help='Preset to write: the Kong "Reason" preset or the external clock test')
+    parser.add_argument('--file', help='Write a .syx preset (e.g. from batch_presets.py) instead')
+    parser.add_argument('--port', '-p', help='Output port name (default: Software Port)')
+    parser.add_argument('--unit', '-u', type=int, help='Controller to use when several are attached')
+    tracing.add_arguments(parser)
+    args = parser.parse_args(argv)
+    tracer = tracing.from_args(args)
+
+    if args.slot is not None and not 2 <= args.slot <= 8:
+        parser.error("slot must be 2-8 (slot 1 is the read-only DAW preset)")
+
+    unit = None
+    if args.unit is not None:
+        from port_registry import get_registry
+
+        unit = get_registry().unit(index=args.unit)
+        if not unit:
+            parser.error(f"no unit {args.unit}")
+
+    with tracer.span('build preset'):
+        if args.file:
+            data = read_syx(args.file, args.slot)
+        else:
+            data = build_preset_data(args.source, 2 if args.slot is None else args.slot)
+    if not 2 <= data[6] <= 8:
+        parser.error(f"{args.file} targets slot {data[6]}; pass --slot 2-8")
+
+    ok = write_preset(data, args.port, unit, tracer)
+    tracing.finish(tracer, args)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()